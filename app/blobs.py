@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+import config
+
+# The shared blob store (see 'get_store()')
+store = None
+store_lock = threading.Lock()
+
+
+class BlobStore:
+    """Store content once per unique hash, compressed and reference counted.
+
+    Each blob is stored as a gzip file named after the sha256 hash of its content, so
+    identical content (e.g. the same robots.txt snapshot across time or across sites) is
+    only stored once. The number of references to each blob is recorded, so that a blob
+    can be deleted once it's no longer referenced.
+
+    Attributes:
+        dir (str): the location of the directory containing the blobs.
+        refs_file (str): the location of the JSON file containing the reference counts.
+        refs (dict): the number of references to each blob, in the form {hash: count}.
+
+    """
+
+    def __init__(self, store_dir):
+        self.dir = store_dir
+        self.refs_file = store_dir + "/refs.json"
+        self.lock = threading.Lock()
+        if not os.path.isdir(self.dir):
+            os.mkdir(self.dir)
+
+        if os.path.isfile(self.refs_file):
+            with open(self.refs_file, 'r') as f:
+                self.refs = json.load(f)
+        else:
+            self.refs = {}
+
+    def __str__(self):
+        return "{} - {}".format(type(self).__name__, self.dir)
+
+    def get_path(self, blob_hash):
+        """Return the location (str) of the blob with a specified hash (str)."""
+        return "{}/{}/{}.gz".format(self.dir, blob_hash[:2], blob_hash)
+
+    def put(self, content):
+        """Store content (bytes) if required, add a reference, and return the content hash (str)."""
+        blob_hash = hashlib.sha256(content).hexdigest()
+        blob_path = self.get_path(blob_hash)
+        with self.lock:
+            if not os.path.isfile(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                temp_path = blob_path + ".tmp"
+                with gzip.open(temp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(temp_path, blob_path)
+
+            self.refs[blob_hash] = self.refs.get(blob_hash, 0) + 1
+            self.save_refs()
+
+        return blob_hash
+
+    def get(self, blob_hash):
+        """Return the content (bytes) of the blob with a specified hash (str)."""
+        with gzip.open(self.get_path(blob_hash), 'rb') as f:
+            return f.read()
+
+    def release(self, blob_hash):
+        """Remove a reference to a blob (str hash), deleting the blob if no references remain."""
+        with self.lock:
+            count = self.refs.get(blob_hash, 0) - 1
+            if count > 0:
+                self.refs[blob_hash] = count
+            else:
+                self.refs.pop(blob_hash, None)
+                if os.path.isfile(self.get_path(blob_hash)):
+                    os.remove(self.get_path(blob_hash))
+
+            self.save_refs()
+
+    def save_refs(self):
+        """Write the reference counts to 'self.refs_file', replacing the previous file."""
+        temp_path = self.refs_file + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.refs, f)
+
+        os.replace(temp_path, self.refs_file)
+
+
+def get_store():
+    """Return the shared blob store in /data/_blobs/, creating it during the first call."""
+    global store
+    with store_lock:
+        if store is None:
+            store = BlobStore(config.PATH + "data/_blobs")
+
+    return store
+
+
+def write_ref(ref_file, content):
+    """Store content (str) in the blob store and write its hash to a reference file.
+
+    Args:
+        ref_file (str): the location of the reference file to create.
+        content (str): the content to store.
+
+    Returns:
+        The content hash (str).
+    """
+    # Create the reference file first, so no reference is added if it already exists
+    with open(ref_file, 'x') as f:
+        blob_hash = get_store().put(content.encode('utf-8', errors='backslashreplace'))
+        f.write(blob_hash + "\n")
+
+    return blob_hash
+
+
+def read_ref(ref_file):
+    """Return the content (str) referenced by a reference file (str location)."""
+    with open(ref_file, 'r') as f:
+        blob_hash = f.read().strip()
+
+    return get_store().get(blob_hash).decode('utf-8')
+
+
+def delete_ref(ref_file):
+    """Delete a reference file (str location) and release its reference to the blob store."""
+    with open(ref_file, 'r') as f:
+        blob_hash = f.read().strip()
+
+    os.remove(ref_file)
+    get_store().release(blob_hash)
@@ -0,0 +1,94 @@
+import os
+
+# The absolute path of the project root directory
+PATH = '/root/package/'
+
+# Get app environment if set, otherwise "prod"
+ENV = os.getenv("ROBOTS_MONITOR_ENV", "prod")
+
+if ENV == "test":
+  # Use test sites, logging etc.
+  PATH += 'tests/test_data/'
+
+# The location of the monitored sites CSV file
+# Refer to the main.py `sites_from_file()` function documentation for more details
+MONITORED_SITES = PATH + "monitored_sites.csv"
+
+# The file location of the main log .txt file
+MAIN_LOG = PATH + "data/main_log.txt"
+
+# The email address of the program administrator, included as a point of contact in all emails
+# This address will receive a summary report every time checks are run
+ADMIN_EMAIL = "ADMIN_EMAIL@example.com"
+
+# The email address that will send emails
+SENDER_EMAIL = "SENDER_EMAIL@example.com"
+
+# Toggle ('True' or 'False') whether emails are enabled (both site admins and the program admin)
+# This requires implementing email sending functionality in the emails.py `send_emails()` function
+EMAILS_ENABLED = False
+
+if ENV == "test":
+  EMAILS_ENABLED = False
+
+# User-agent string sent in request headers
+USER_AGENT = "Robots.txtMonitor/1.0"
+
+# The maximum number of robots.txt checks run concurrently (1 = check sites one at a time)
+MAX_WORKERS = 1
+
+# The maximum number of concurrent robots.txt checks against a single host
+MAX_WORKERS_PER_HOST = 1
+
+# The HTTP connection pool size in the form (number of hosts, connections per host)
+# If None, the pool size is based on MAX_WORKERS and MAX_WORKERS_PER_HOST
+HTTP_POOL_SIZE = None
+
+# The number of seconds that DNS lookup results are cached for (0 = caching disabled)
+DNS_CACHE_TTL = 0
+
+# How robots.txt snapshots and diffs are stored in each site's /snapshots/ directory
+# "files": a plain text/HTML file per snapshot/diff
+# "blobs": a reference to compressed content in /data/_blobs/, where identical content is
+# only stored once across all snapshots and sites (read using `blobs.read_ref()`)
+SNAPSHOT_STORE = "files"
+
+# Where site records (robots.txt content, metadata, site logs, and snapshot details) are stored
+# "files": a directory per site in /data/
+# "sqlite": a single SQLite database (/data/robots_monitor.sqlite3), with snapshot and diff
+# content stored in /data/_blobs/ (refer to SNAPSHOT_STORE) and email attachments created
+# in /data/_attachments/ when required
+STORAGE_BACKEND = "files"
+
+# Limits for the line-by-line diff of changed robots.txt files
+# If a file has more than DIFF_MAX_LINES lines, more than DIFF_MAX_EDITS lines were added or
+# removed, or the diff takes longer than DIFF_TIMEOUT seconds, a summary is reported instead
+DIFF_MAX_LINES = 50000
+DIFF_MAX_EDITS = 2000
+DIFF_TIMEOUT = 10
+
+# The number of unchanged lines shown before and after each change in a diff
+DIFF_CONTEXT_LINES = 3
+
+# Toggle ('True' or 'False') adaptive scheduling, where each run only checks sites which are due
+# Sites are due more often after a change and less often while unchanged (refer to scheduling.py)
+# If disabled, every site is checked during every run (the history is still recorded)
+ADAPTIVE_SCHEDULE = False
+
+# The minimum and maximum number of seconds between checks of a site (if ADAPTIVE_SCHEDULE)
+# The minimum should be roughly the same as the time between runs (e.g. cron job frequency)
+SCHEDULE_MIN_INTERVAL = 60 * 60
+SCHEDULE_MAX_INTERVAL = 7 * 24 * 60 * 60
+
+# The multiplier applied to a site's check interval after each check with no change
+SCHEDULE_BACKOFF = 2
+
+# Daemon mode (daemon.py): the number of seconds between checks of the sites which are due
+# Checks are spread evenly so that every site can be checked once per SCHEDULE_MIN_INTERVAL
+DAEMON_TICK = 60
+
+# Daemon mode: the number of seconds between sending site emails
+DAEMON_EMAIL_INTERVAL = 5 * 60
+
+# Daemon mode: the number of seconds between summaries (main log and admin email)
+DAEMON_REPORT_INTERVAL = 24 * 60 * 60
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+""" Run robots.txt checks continuously in a long-running process (daemon mode).
+https://github.com/Cmastris/robotstxt-change-monitor
+"""
+
+import argparse
+import math
+import os
+import signal
+import threading
+import time
+
+import config
+import emails
+import logs
+import main
+import scheduling
+import storage
+
+
+class Daemon:
+    """Check monitored sites continuously, spreading checks evenly over time.
+
+    Unlike 'main.main()', which checks all (due) sites in a single burst, the daemon stays
+    resident: the HTTP session (refer to fetching.py), site list, and schedule are kept in
+    memory between checks. Every 'config.DAEMON_TICK' seconds, the sites which are due
+    (refer to 'scheduling.Scheduler.get_due_time()') are checked, limited to the number of
+    sites required to check every site once per 'config.SCHEDULE_MIN_INTERVAL'. Site emails
+    are sent every 'config.DAEMON_EMAIL_INTERVAL' seconds, and the summary is logged and
+    emailed to the admin every 'config.DAEMON_REPORT_INTERVAL' seconds.
+
+    Attributes:
+        shard (None, tuple): if set, only sites in the shard are checked (refer to
+        'main.in_shard()').
+        sites (list): the monitored sites (refer to 'main.iter_sites()').
+        sites_mtime (None, int): the modification time of the loaded sites CSV.
+        scheduler (Scheduler): the site check schedule.
+        checks (RunChecks): used to run checks and reports, and count the results.
+        stop_event (threading.Event): set to stop the daemon (refer to 'stop()').
+
+    """
+
+    def __init__(self, shard=None):
+        self.shard = shard
+        self.sites = []
+        self.sites_mtime = None
+        self.scheduler = scheduling.Scheduler(storage.get_storage(), shard)
+        self.checks = main.RunChecks([], self.scheduler)
+        self.stop_event = threading.Event()
+
+    def __str__(self):
+        return "{} - {} sites".format(type(self).__name__, len(self.sites))
+
+    def load_sites(self):
+        """Load the monitored sites CSV, unless it's unchanged since it was last loaded."""
+        sites_mtime = os.stat(config.MONITORED_SITES).st_mtime_ns
+        if sites_mtime != self.sites_mtime:
+            self.sites = main.sites_from_file(config.MONITORED_SITES, self.shard)
+            self.sites_mtime = sites_mtime
+            # Remove the history of sites which are no longer monitored when next saved
+            self.scheduler.seen.clear()
+
+    def get_due_sites(self, now):
+        """Return a list of the sites which are due at a time (float), most overdue first.
+
+        The number of sites is limited so that checks are spread evenly over time, including
+        when the daemon starts (when all sites without a history are due).
+        """
+        max_sites = math.ceil(len(self.sites) * config.DAEMON_TICK / config.SCHEDULE_MIN_INTERVAL)
+        due = []
+        for index, site_attributes in enumerate(self.sites):
+            due_time = self.scheduler.get_due_time(site_attributes[0])
+            if due_time <= now:
+                due.append((due_time, index))
+
+        return [self.sites[index] for _, index in sorted(due)[:max(1, max_sites)]]
+
+    def check_due_sites(self):
+        """Run checks and reports for the sites which are currently due."""
+        self.load_sites()
+        now = time.time()
+        self.checks.sites = self.get_due_sites(now)
+        self.scheduler.now = now
+        for site_attributes, check in self.checks.run_checks():
+            self.checks.check_site(site_attributes, check)
+
+        self.scheduler.save()
+        storage.get_storage().flush()
+
+    def send_site_emails(self):
+        """Send and clear the queued site emails."""
+        storage.get_storage().flush()
+        emails.send_emails(emails.site_emails)
+        emails.site_emails.clear()
+
+    def report(self):
+        """Log the summary since the last report, send all emails, and clear the email queues."""
+        self.checks.finish_checks()
+        if config.EMAILS_ENABLED:
+            emails.send_emails(emails.admin_email)
+
+        emails.site_emails.clear()
+        emails.admin_email.clear()
+        logs.admin_email_errors.clear()
+        logs.update_main_log("\n{}\n".format(logs.END_OF_RUN), include_timestamp=False)
+
+    def run(self):
+        """Check due sites every tick and send emails/reports until 'stop()' is called."""
+        main.create_data_dir()
+        while not self.stop_event.is_set():
+            start_content = "Starting checks (daemon mode)."
+            logs.update_main_log(start_content)
+            print(start_content)
+            self.checks.reset_counts()
+
+            report_time = time.monotonic() + config.DAEMON_REPORT_INTERVAL
+            email_time = time.monotonic() + config.DAEMON_EMAIL_INTERVAL
+            while not self.stop_event.is_set() and time.monotonic() < report_time:
+                tick_start = time.monotonic()
+                try:
+                    self.check_due_sites()
+                    if time.monotonic() >= email_time:
+                        self.send_site_emails()
+                        email_time = time.monotonic() + config.DAEMON_EMAIL_INTERVAL
+
+                # Keep running after unexpected errors (e.g. a missing sites CSV)
+                except Exception as e:
+                    err_msg = logs.get_err_str(e, "Unexpected error in daemon mode.")
+                    logs.log_error(err_msg)
+
+                self.stop_event.wait(max(0, tick_start + config.DAEMON_TICK - time.monotonic()))
+
+            self.report()
+
+    def stop(self, *args):
+        """Stop the daemon after the current tick (accepts signal handler arguments)."""
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check monitored robots.txt files continuously.")
+    parser.add_argument('--shard', type=main.parse_shard, metavar='i/n',
+                        help="only check the i-th of n disjoint subsets of the monitored sites")
+    args = parser.parse_args()
+
+    daemon = Daemon(shard=args.shard)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run()
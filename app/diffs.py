@@ -0,0 +1,304 @@
+import collections
+import html
+import time
+
+import config
+
+HTML_TEMPLATE = """<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"
+          "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html>
+<head>
+    <meta http-equiv="Content-Type" content="text/html; charset=utf-8" />
+    <title>Robots.txt Diff</title>
+    <style type="text/css">
+        table.diff {{font-family: Courier; border: medium; border-collapse: collapse;}}
+        table.diff td {{padding: 0 0.5em; white-space: pre-wrap; vertical-align: top;}}
+        .diff_header {{background-color: #e0e0e0; text-align: right;}}
+        .diff_hunk {{background-color: #c0c0ff;}}
+        .diff_add {{background-color: #aaffaa;}}
+        .diff_chg {{background-color: #ffff77;}}
+        .diff_sub {{background-color: #ffaaaa;}}
+    </style>
+</head>
+<body>
+{}
+</body>
+</html>
+"""
+
+
+class DiffLimitExceeded(Exception):
+    """Raised when a diff exceeds the configured size, edit, or time limits."""
+
+
+def hash_lines(old_lines, new_lines):
+    """Return the lines of two sequences as lists of integers (equal lines have equal integers).
+
+    Comparing integers rather than strings makes the comparisons during the diff cheaper.
+    """
+    line_ids = {}
+    old_ids = [line_ids.setdefault(line, len(line_ids)) for line in old_lines]
+    new_ids = [line_ids.setdefault(line, len(line_ids)) for line in new_lines]
+    return old_ids, new_ids
+
+
+def find_matches(a, b, max_edits, deadline):
+    """Return the matching blocks of two integer sequences using the Myers diff algorithm.
+
+    The algorithm takes O((N + M) * D) time, where D is the number of lines added and removed,
+    so it's fast for the typical robots.txt change (a few lines) regardless of file size.
+
+    Args:
+        a (list): the previous lines (refer to 'hash_lines()').
+        b (list): the new lines (refer to 'hash_lines()').
+        max_edits (int): the maximum number of added and removed lines.
+        deadline (float): the 'time.monotonic()' time after which the diff is abandoned.
+
+    Returns:
+        A list of matching blocks in the form (a index, b index, size), in order.
+
+    Raises:
+        DiffLimitExceeded: if 'max_edits' or 'deadline' is exceeded.
+    """
+    n, m = len(a), len(b)
+    max_d = min(n + m, max_edits)
+    # The furthest x reached on each diagonal k (index k + offset), and a copy of the relevant
+    # diagonals before each edit distance d (used to find the path taken)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        if time.monotonic() > deadline:
+            raise DiffLimitExceeded("The diff took longer than the time limit.")
+
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return backtrack(trace, n, m)
+
+    raise DiffLimitExceeded("More than {} lines were added or removed.".format(max_edits))
+
+
+def backtrack(trace, n, m):
+    """Return the matching blocks (list of tuples) of the path found by 'find_matches()'."""
+    blocks = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        # The furthest x on each diagonal before edit distance d, indexed from k = -d - 1
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k + d] < v[k + d + 2]):
+            # A line was inserted (moving down from diagonal k + 1)
+            prev_x = v[k + d + 2]
+            prev_y = prev_x - k - 1
+            mid_x = prev_x
+        else:
+            # A line was deleted (moving right from diagonal k - 1)
+            prev_x = v[k + d]
+            prev_y = prev_x - k + 1
+            mid_x = prev_x + 1
+
+        # The matching lines following the insertion/deletion
+        if x > mid_x:
+            blocks.append((mid_x, mid_x - k, x - mid_x))
+        x, y = prev_x, prev_y
+
+    if x > 0:
+        blocks.append((0, 0, x))
+
+    blocks.reverse()
+    return blocks
+
+
+def get_opcodes(old_lines, new_lines, max_edits=None, timeout=None):
+    """Return a list of opcodes describing how to turn 'old_lines' into 'new_lines'.
+
+    Opcodes are in the same form as 'difflib.SequenceMatcher.get_opcodes()', i.e.
+    (tag, i1, i2, j1, j2) where tag is "equal", "replace", "delete", or "insert".
+
+    Args:
+        old_lines (list): the previous lines (str).
+        new_lines (list): the new lines (str).
+        max_edits (int): the maximum number of added/removed lines ('config.DIFF_MAX_EDITS').
+        timeout (float): the maximum number of seconds ('config.DIFF_TIMEOUT').
+
+    Raises:
+        DiffLimitExceeded: if the number of lines, edits, or seconds exceeds the limits.
+    """
+    max_edits = config.DIFF_MAX_EDITS if max_edits is None else max_edits
+    timeout = config.DIFF_TIMEOUT if timeout is None else timeout
+    if max(len(old_lines), len(new_lines)) > config.DIFF_MAX_LINES:
+        raise DiffLimitExceeded("The file is longer than {} lines."
+                                "".format(config.DIFF_MAX_LINES))
+
+    a, b = hash_lines(old_lines, new_lines)
+
+    # Matching lines at the start and end don't need to be compared by the diff algorithm
+    prefix = 0
+    while prefix < min(len(a), len(b)) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(a), len(b)) - prefix and a[-suffix - 1] == b[-suffix - 1]:
+        suffix += 1
+
+    middle = find_matches(a[prefix:len(a) - suffix], b[prefix:len(b) - suffix],
+                          max_edits, time.monotonic() + timeout)
+    blocks = [(0, 0, prefix)]
+    blocks += [(i + prefix, j + prefix, size) for i, j, size in middle]
+    blocks.append((len(a) - suffix, len(b) - suffix, suffix))
+
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in blocks:
+        if i < block_i and j < block_j:
+            opcodes.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(("delete", i, block_i, j, block_j))
+        elif j < block_j:
+            opcodes.append(("insert", i, block_i, j, block_j))
+
+        if size:
+            opcodes.append(("equal", block_i, block_i + size, block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+
+    return opcodes
+
+
+def group_opcodes(opcodes, context=3):
+    """Return a list of opcode groups (hunks), with up to 'context' lines of unchanged context.
+
+    Based on 'difflib.SequenceMatcher.get_grouped_opcodes()', except that no groups are
+    returned if there are no changes.
+    """
+    codes = list(opcodes)
+    if not codes:
+        return []
+
+    # Trim unchanged lines at the start and end to the context
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    groups, group = [], []
+    for tag, i1, i2, j1, j2 in codes:
+        # Split groups separated by more unchanged lines than the context before and after
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+
+    groups.append(group)
+    return [g for g in groups if any(opcode[0] != "equal" for opcode in g)]
+
+
+def get_summary(old_lines, new_lines, reason):
+    """Return a summary (str) of the lines added/removed, regardless of their position."""
+    old_counts = collections.Counter(old_lines)
+    new_counts = collections.Counter(new_lines)
+    removed = sum((old_counts - new_counts).values())
+    added = sum((new_counts - old_counts).values())
+    return "A line-by-line diff wasn't created. {} Previous: {} lines. New: {} lines. " \
+           "Lines removed: {}. Lines added: {}.".format(reason, len(old_lines), len(new_lines),
+                                                      removed, added)
+
+
+def unified_diff(old_lines, new_lines, context=None, from_label="Previous", to_label="New"):
+    """Return a unified diff (str) of two lists of lines (or a summary if limits are exceeded).
+
+    Args:
+        old_lines (list): the previous lines (str, excluding line endings).
+        new_lines (list): the new lines (str, excluding line endings).
+        context (int): the number of unchanged lines shown around each change.
+        from_label (str): the label of the previous lines.
+        to_label (str): the label of the new lines.
+
+    """
+    context = config.DIFF_CONTEXT_LINES if context is None else context
+    try:
+        groups = group_opcodes(get_opcodes(old_lines, new_lines), context)
+    except DiffLimitExceeded as e:
+        return get_summary(old_lines, new_lines, str(e)) + "\n"
+
+    output = ["--- {}".format(from_label), "+++ {}".format(to_label)]
+    for group in groups:
+        i1, i2, j1, j2 = group[0][1], group[-1][2], group[0][3], group[-1][4]
+        output.append("@@ -{},{} +{},{} @@".format(i1 + 1, i2 - i1, j1 + 1, j2 - j1))
+        for tag, a1, a2, b1, b2 in group:
+            if tag == "equal":
+                output.extend(" " + line for line in old_lines[a1:a2])
+                continue
+            output.extend("-" + line for line in old_lines[a1:a2])
+            output.extend("+" + line for line in new_lines[b1:b2])
+
+    return "\n".join(output) + "\n"
+
+
+def html_diff(old_lines, new_lines, context=None, from_label="Previous", to_label="New"):
+    """Return an HTML file (str) with a side-by-side diff table of the changed lines.
+
+    Only changed lines and their context are included. If the size, edit, or time limits are
+    exceeded (refer to 'get_opcodes()'), a summary is included instead of the diff table.
+
+    Args:
+        old_lines (list): the previous lines (str, excluding line endings).
+        new_lines (list): the new lines (str, excluding line endings).
+        context (int): the number of unchanged lines shown around each change.
+        from_label (str): the label of the previous lines.
+        to_label (str): the label of the new lines.
+
+    """
+    context = config.DIFF_CONTEXT_LINES if context is None else context
+    try:
+        groups = group_opcodes(get_opcodes(old_lines, new_lines), context)
+    except DiffLimitExceeded as e:
+        summary = get_summary(old_lines, new_lines, str(e))
+        return HTML_TEMPLATE.format("<p>{}</p>".format(html.escape(summary)))
+
+    rows = ['<table class="diff" summary="Robots.txt diff">',
+            '<thead><tr><th class="diff_header" colspan="2">{}</th>'
+            '<th class="diff_header" colspan="2">{}</th></tr></thead>'
+            ''.format(html.escape(from_label), html.escape(to_label))]
+
+    def cell(lines, index, css_class):
+        if index is None:
+            return '<td class="diff_header"></td><td></td>'
+        text = html.escape(lines[index])
+        if css_class:
+            text = '<span class="{}">{}</span>'.format(css_class, text)
+        return '<td class="diff_header">{}</td><td>{}</td>'.format(index + 1, text)
+
+    for group in groups:
+        i1, i2, j1, j2 = group[0][1], group[-1][2], group[0][3], group[-1][4]
+        rows.append('<tbody><tr><td class="diff_hunk" colspan="4">Lines {}-{} / {}-{}</td></tr>'
+                    ''.format(i1 + 1, i2, j1 + 1, j2))
+        for tag, a1, a2, b1, b2 in group:
+            for offset in range(max(a2 - a1, b2 - b1)):
+                old_index = a1 + offset if a1 + offset < a2 else None
+                new_index = b1 + offset if b1 + offset < b2 else None
+                if tag == "equal":
+                    rows.append("<tr>{}{}</tr>".format(cell(old_lines, old_index, None),
+                                                       cell(new_lines, new_index, None)))
+                else:
+                    rows.append("<tr>{}{}</tr>".format(cell(old_lines, old_index, "diff_sub"),
+                                                       cell(new_lines, new_index, "diff_add")))
+        rows.append("</tbody>")
+
+    rows.append("</table>")
+    return HTML_TEMPLATE.format("\n".join(rows))
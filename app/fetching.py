@@ -0,0 +1,90 @@
+import http.cookiejar
+import socket
+import threading
+import time
+
+import requests
+
+import config
+
+# The shared HTTP session used for all robots.txt requests (see 'get_session()')
+session = None
+session_lock = threading.Lock()
+
+
+class DNSCache:
+    """Cache the results of 'socket.getaddrinfo()' lookups for a fixed number of seconds.
+
+    Attributes:
+        ttl (int): the number of seconds that a lookup result is cached for.
+        lookups (dict): cached results in the form {lookup args: (expiry time, result)}.
+        resolver (func): the original (uncached) 'socket.getaddrinfo()' function.
+
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.lookups = {}
+        self.lock = threading.Lock()
+        self.resolver = socket.getaddrinfo
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Return a cached 'socket.getaddrinfo()' result, or look up and cache the result."""
+        key = (host, port, family, type, proto, flags)
+        with self.lock:
+            cached = self.lookups.get(key)
+
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        result = self.resolver(host, port, family, type, proto, flags)
+        with self.lock:
+            self.lookups[key] = (time.monotonic() + self.ttl, result)
+
+        return result
+
+    def install(self):
+        """Use this cache for all 'socket.getaddrinfo()' lookups made by the process."""
+        socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        """Restore the original (uncached) 'socket.getaddrinfo()' function."""
+        socket.getaddrinfo = self.resolver
+
+
+def create_session():
+    """Create and return a connection-pooled 'requests.Session' for robots.txt requests.
+
+    Unless set in 'config.HTTP_POOL_SIZE', the pool size is based on the run's concurrency:
+    a pool is kept for up to 'config.MAX_WORKERS' hosts (minimum 10), each holding up to
+    'config.MAX_WORKERS_PER_HOST' kept-alive connections. Cookies are never stored, so that
+    every request is independent (as with 'requests.get()').
+    """
+    if config.HTTP_POOL_SIZE:
+        pool_connections, pool_maxsize = config.HTTP_POOL_SIZE
+    else:
+        pool_connections = max(10, config.MAX_WORKERS)
+        pool_maxsize = max(1, config.MAX_WORKERS_PER_HOST)
+
+    new_session = requests.Session()
+    new_session.headers['User-Agent'] = config.USER_AGENT
+    new_session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections,
+                                            pool_maxsize=pool_maxsize)
+    new_session.mount('http://', adapter)
+    new_session.mount('https://', adapter)
+
+    if config.DNS_CACHE_TTL:
+        DNSCache(config.DNS_CACHE_TTL).install()
+
+    return new_session
+
+
+def get_session():
+    """Return the shared HTTP session, creating it during the first call."""
+    global session
+    with session_lock:
+        if session is None:
+            session = create_session()
+
+    return session
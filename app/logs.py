@@ -1,6 +1,9 @@
 import datetime
 import functools
+import locale
 import os
+import re
+import threading
 import traceback
 
 import config
@@ -8,6 +11,21 @@ import config
 # Errors that will be emailed (if configured) to 'ADMIN_EMAIL' in config.py
 admin_email_errors = []
 
+# Serialises log file updates, which may be made by concurrent check threads
+file_lock = threading.Lock()
+
+# The first line of every log file, used to identify the append-only (oldest first) format
+LOG_HEADER = "# Robots.txt Monitor log (oldest entries first)"
+
+# The final line of each run in the main log
+END_OF_RUN = "{}END OF RUN{}".format("-"*20, "-"*20)
+
+# Matches the start of a timestamped log entry (see 'get_timestamp()')
+ENTRY_START = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}: ")
+
+# Log files which have been checked (and migrated if required) since the program started
+checked_logs = set()
+
 
 def unexpected_exception_handling(func):
     """Wrap the passed function in a generic try/except block and log any exception."""
@@ -67,15 +85,170 @@ def log_error(error_message, print_err=True, log_in_main=True, in_admin_email=Tr
         admin_email_errors.append(error_message)
 
 
-def prepend_to_file(file_path, content):
-    """Prepend content (str) to a new line of a file at a specified path (str)."""
-    existing_content = ""
+def append_to_log(file_path, content):
+    """Append content (str) as a new entry of the log file at a specified path (str).
+
+    The log file is created if it doesn't exist, or migrated from the previous format
+    (newest entries first) during the first update since the program started.
+    """
+    with file_lock:
+        if file_path not in checked_logs:
+            migrate_log(file_path)
+            checked_logs.add(file_path)
+
+        with open(file_path, 'a') as f:
+            f.write(content + "\n")
+
+
+def migrate_log(file_path):
+    """Create a new log file or convert an existing log file to the append-only format.
+
+    Log files were previously updated by prepending each entry (newest entries first). The
+    entries of these files are reversed (without changing the lines within each entry) and
+    the file is replaced with the append-only format, identified by 'LOG_HEADER'.
+
+    Args:
+        file_path (str): the location of the log file to create or migrate.
+
+    """
     if os.path.exists(file_path):
         with open(file_path, 'r') as f:
-            existing_content = f.read()
+            if f.readline().rstrip("\n") == LOG_HEADER:
+                return
+
+            f.seek(0)
+            content = f.read()
+
+        if content.endswith("\n"):
+            content = content[:-1]
+
+        lines = content.split("\n") if content else []
+
+        entries, entry_lines = [], []
+        for i, line in enumerate(lines):
+            next_line = lines[i + 1] if i + 1 < len(lines) else None
+            previous_line = lines[i - 1] if i > 0 else None
+            if entry_lines and is_entry_start(line, previous_line, next_line):
+                entries.append("\n".join(entry_lines))
+                entry_lines = []
+
+            entry_lines.append(line)
+
+        if entry_lines:
+            entries.append("\n".join(entry_lines))
+
+        content = "".join(entry + "\n" for entry in reversed(entries))
+
+    else:
+        content = ""
+
+    temp_path = file_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        f.write(LOG_HEADER + "\n" + content)
+
+    os.replace(temp_path, file_path)
+
+
+def is_entry_start(line, previous_line, next_line):
+    """Return whether a line (str) is the first line of a log entry.
+
+    Entries start with a timestamp, apart from the end of run entry which
+    starts with a blank line (if present) before 'END_OF_RUN'.
+
+    Args:
+        line (str): the line to check.
+        previous_line (None, str): the line before in the same log, if any.
+        next_line (None, str): the line after in the same log, if any.
+
+    """
+    if ENTRY_START.match(line):
+        return True
+    if line == "" and next_line == END_OF_RUN:
+        return True
+    return line == END_OF_RUN and previous_line != ""
+
+
+def read_lines_reversed(file_path, block_size=65536):
+    """Yield the lines (str, excluding line endings) of a text file, starting with the last line.
+
+    The file is read backwards in blocks, so the most recent lines of a large log file can be
+    read without reading the whole file.
+
+    Args:
+        file_path (str): the location of the text file.
+        block_size (int): the number of bytes read at a time.
+
+    """
+    encoding = locale.getpreferredencoding(False)
+    with open(file_path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = None
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            if remainder is None:
+                # Ignore the final line ending
+                if block.endswith(b"\n"):
+                    block = block[:-1]
+                remainder = b""
+
+            lines = (block + remainder).split(b"\n")
+            # The first line may continue in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                yield line.rstrip(b"\r").decode(encoding, errors='replace')
+
+        if remainder is not None:
+            yield remainder.rstrip(b"\r").decode(encoding, errors='replace')
+
+
+def read_log_entries(file_path):
+    """Yield the entries (str) of an append-only log file, newest first.
+
+    Args:
+        file_path (str): the location of the log file.
+
+    """
+    # The lines of the current entry, in reverse order
+    entry_lines = []
+    for line in read_lines_reversed(file_path):
+        if entry_lines and entry_lines[-1] == END_OF_RUN and line != "":
+            # The end of run entry doesn't have a blank first line
+            yield "\n".join(reversed(entry_lines))
+            entry_lines = []
+
+        entry_lines.append(line)
+        next_line = entry_lines[-2] if len(entry_lines) > 1 else None
+        if ENTRY_START.match(line) or (line == "" and next_line == END_OF_RUN):
+            yield "\n".join(reversed(entry_lines))
+            entry_lines = []
+
+    if entry_lines and entry_lines != [LOG_HEADER]:
+        if entry_lines[-1] == LOG_HEADER:
+            entry_lines.pop()
+        yield "\n".join(reversed(entry_lines))
+
+
+def get_latest_lines(file_path, num_lines):
+    """Return a list of the latest lines (str) of an append-only log file.
+
+    Lines are returned in the same order as the previous log format, i.e. newest entry first,
+    with the lines of each entry in their original order.
+
+    Args:
+        file_path (str): the location of the log file.
+        num_lines (int): the maximum number of lines to return.
+
+    """
+    lines = []
+    for entry in read_log_entries(file_path):
+        if len(lines) >= num_lines:
+            break
+        lines.extend(entry.split("\n"))
 
-    with open(file_path, 'w') as f:
-        f.write(content + "\n" + existing_content)
+    return lines[:num_lines]
 
 
 def update_main_log(message, blank_after=False, include_timestamp=True):
@@ -94,7 +267,7 @@ def update_main_log(message, blank_after=False, include_timestamp=True):
         if blank_after:
             message = message + "\n"
 
-        prepend_to_file(config.MAIN_LOG, message)
+        append_to_log(config.MAIN_LOG, message)
 
     except Exception as e:
         err_msg = get_err_str(e, "Error when updating the main log.")
@@ -3,20 +3,33 @@
 https://github.com/Cmastris/robotstxt-change-monitor
 """
 
+import argparse
+import collections
+import concurrent.futures
 import csv
-import difflib
+import hashlib
+import heapq
+import locale
 import os
 import time
+import urllib.parse
 
 import requests
 
 import config
+import diffs
 import emails
+import fetching
 import logs
+import scheduling
+import storage
 
 
-def sites_from_file(file):
-    """Extract monitored sites data from a CSV and return as a list of lists.
+def iter_sites(file, shard=None):
+    """Yield monitored sites data from a CSV, one site (list) at a time.
+
+    Rows are read and validated as they're yielded, so the full CSV is never held in memory.
+    Rows which can't be extracted are logged and skipped.
 
     Args:
         file (str): file location of a CSV file with the following attributes:
@@ -26,9 +39,13 @@ def sites_from_file(file):
             - email (col3): the email address of the site admin if emails are enabled.
                             Note: an email header row label is required but email addresses
                             don't need to be populated if emails are disabled.
+        shard (None, tuple): if set, only sites in the shard are yielded, in the form
+        (shard number, shard count) (refer to 'in_shard()').
+
+    Yields:
+        A list representing a single site's attributes in the form [url, name, email].
 
     """
-    data = []
     with open(file, 'r') as sites_file:
         csv_reader = csv.reader(sites_file, delimiter=',')
         row_num = 0
@@ -36,15 +53,83 @@ def sites_from_file(file):
             # Skip the header row labels
             if row_num > 0:
                 try:
-                    data.append([row[0], row[1], row[2]])
+                    site_attributes = [row[0], row[1], row[2]]
                 except Exception as e:
                     err_msg = logs.get_err_str(e, "Couldn't extract row {} from CSV."
                                                "".format(row_num))
                     logs.log_error(err_msg)
+                else:
+                    if shard is None or in_shard(site_attributes[0], shard):
+                        yield site_attributes
 
             row_num += 1
 
-    return data
+
+def sites_from_file(file, shard=None):
+    """Extract monitored sites data from a CSV and return as a list of lists.
+
+    Refer to 'iter_sites()' for details of the arguments.
+    """
+    return list(iter_sites(file, shard))
+
+
+def in_shard(url, shard):
+    """Return True if a URL (str) is in a shard (tuple), otherwise False.
+
+    Sites are assigned to shards by a stable hash of the URL, so that separate processes (e.g.
+    on separate hosts) can each check a disjoint subset of the same monitored sites CSV.
+
+    Args:
+        url (str): the absolute URL of the website homepage.
+        shard (tuple): the shard in the form (shard number, shard count), where the shard
+        number is between 1 and the shard count (inclusive).
+
+    """
+    number, count = shard
+    url_hash = hashlib.sha256(url.strip().lower().encode('utf-8')).digest()
+    return int.from_bytes(url_hash[:8], 'big') % count == number - 1
+
+
+def parse_shard(value):
+    """Return a shard (tuple) in the form (shard number, shard count) from a str "i/n"."""
+    try:
+        number, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Shard '{}' isn't in the form i/n.".format(value))
+
+    if not 1 <= number <= count:
+        raise argparse.ArgumentTypeError("Shard '{}' must be between 1/{} and {}/{}."
+                                         "".format(value, count, count, count))
+    return number, count
+
+
+def get_host(url):
+    """Return the lowercase host name (str) of a URL, or None if it can't be parsed."""
+    try:
+        return urllib.parse.urlsplit(url.strip().lower()).hostname
+    except Exception:
+        return None
+
+
+def normalise_content(extraction):
+    """Return robots.txt content (str) as it would be read back after writing it to a file.
+
+    Characters which can't be encoded are replaced with an escape sequence (as in
+    'RobotsCheck.update_records()') and line endings are normalised.
+    """
+    encoding = locale.getpreferredencoding(False)
+    content = extraction.encode(encoding, errors='backslashreplace').decode(encoding)
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def get_fingerprint(content):
+    """Return a fingerprint of normalised robots.txt content (str) for change detection.
+
+    Returns:
+        A list in the form [sha256 hex digest, byte length] of the encoded content.
+    """
+    content_bytes = content.encode(locale.getpreferredencoding(False))
+    return [hashlib.sha256(content_bytes).hexdigest(), len(content_bytes)]
 
 
 class RunChecks:
@@ -52,10 +137,13 @@ class RunChecks:
 
     This class is used to run robots.txt checks by initialising RobotsCheck instances,
     before initialising the relevant Report subclass to generate logs and communications.
+    Checks can run concurrently (refer to 'config.MAX_WORKERS'), but reports are always
+    created in the same order as the sites list.
 
     Attributes:
-        sites (list): a list of lists, with each list item representing a single site's
-        attributes in the form [url, name, email]. Each attribute is detailed below.
+        sites (iterable): a list of lists (or an iterable such as 'iter_sites()'), with each
+        item representing a single site's attributes in the form [url, name, email]. Each
+        attribute is detailed below.
             - url (str): the absolute URL of the website homepage, with a trailing slash.
             - name (str): the website's name identifier (letters/numbers only).
             - email (str): the email address of the site admin if emails are enabled,
@@ -65,25 +153,43 @@ class RunChecks:
         change (int): a count of site checks with a robots.txt change.
         first_run (int): a count of site checks which were the first successful check.
         error (int): a count of site checks which could not be completed due to an error.
+        not_due (int): a count of sites which weren't checked because they weren't due.
+        scheduler (None, Scheduler): if set, only sites which are due are checked, and the
+        result of each check is recorded (refer to 'scheduling.Scheduler').
 
     """
 
-    def __init__(self, sites):
-        self.sites = sites.copy()
+    def __init__(self, sites, scheduler=None):
+        self.sites = sites
+        self.scheduler = scheduler
         self.no_change, self.change, self.first_run, self.error = 0, 0, 0, 0
+        self.not_due = 0
 
     def check_all(self):
         """Run robots.txt checks and reports for all sites."""
-        start_content = "Starting checks on {} sites.".format(len(self.sites))
+        if hasattr(self.sites, '__len__'):
+            start_content = "Starting checks on {} sites.".format(len(self.sites))
+        else:
+            start_content = "Starting checks."
         logs.update_main_log(start_content)
         print(start_content)
 
         self.reset_counts()
-        for site_attributes in self.sites:
-            self.check_site(site_attributes)
+        for site_attributes, check in self.run_checks():
+            self.check_site(site_attributes, check)
+
+        self.finish_checks()
+
+    def finish_checks(self):
+        """Save records, log the summary, send site emails, and prepare the admin email."""
+        if self.scheduler is not None:
+            self.scheduler.save()
+        storage.get_storage().flush()
 
         summary = "Checks and reports complete. No change: {}. Change: {}. First run: {}. " \
                   "Error: {}.".format(self.no_change, self.change, self.first_run, self.error)
+        if config.ADAPTIVE_SCHEDULE:
+            summary += " Not due: {}.".format(self.not_due)
 
         print("\n" + summary)
         logs.update_main_log(summary, blank_after=True)
@@ -93,8 +199,134 @@ class RunChecks:
         email_body = emails.get_admin_email_body(summary)
         emails.admin_email.append((config.ADMIN_EMAIL, email_subject, email_body, config.MAIN_LOG))
 
-    def check_site(self, site_attributes):
-        """Run a robots.txt check and report for a single site.
+    def run_checks(self):
+        """Run robots.txt checks (excluding reports) for all sites and yield the results.
+
+        Checks are run by a pool of up to 'config.MAX_WORKERS' threads, with no more than
+        'config.MAX_WORKERS_PER_HOST' checks of the same host running at once. If a connection
+        attempt fails, the check is held in a deferred retry queue until its wait has expired,
+        so that other sites are checked in the meantime. Sites are taken from 'self.sites' as
+        workers become available, and completed checks are buffered so that results are
+        yielded in the same order as 'self.sites'.
+
+        Yields:
+            A tuple in the form (site_attributes, check), where check is either the completed
+            RobotsCheck instance or the exception raised while initialising the check.
+
+        """
+        max_workers = max(1, config.MAX_WORKERS)
+        max_per_host = max(1, config.MAX_WORKERS_PER_HOST)
+        # Limit the number of blocked sites, so that sites aren't read ahead indefinitely
+        max_blocked = max_workers * 100
+        sites = enumerate(self.due_sites())
+        sites_remaining = True
+        # Items in the form (index, site_attributes, check), where check is None until retried
+        pending = collections.deque()
+        # Sites waiting for a check of the same host to finish, keyed by host
+        blocked = collections.defaultdict(collections.deque)
+        blocked_count = 0
+        # A heap of checks awaiting a retry, in the form (retry_time, index, site, check)
+        deferred = []
+        host_counts = collections.Counter()
+        in_flight = {}
+        results = {}
+        next_index = 0
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while sites_remaining or pending or in_flight or deferred:
+                # Retry deferred checks (ahead of any unchecked sites) once their wait has expired
+                ready = []
+                while deferred and deferred[0][0] <= time.monotonic():
+                    _, index, site_attributes, check = heapq.heappop(deferred)
+                    ready.append((index, site_attributes, check))
+                pending.extendleft(reversed(ready))
+
+                while len(in_flight) < max_workers:
+                    if pending:
+                        index, site_attributes, check = pending.popleft()
+                    elif sites_remaining and blocked_count < max_blocked:
+                        index, site_attributes = next(sites, (None, None))
+                        if index is None:
+                            sites_remaining = False
+                            continue
+                        check = None
+                    else:
+                        break
+
+                    host = get_host(site_attributes[0])
+                    if host_counts[host] >= max_per_host:
+                        blocked[host].append((index, site_attributes, check))
+                        blocked_count += 1
+                        continue
+
+                    host_counts[host] += 1
+                    future = executor.submit(self.run_site_check, site_attributes, check)
+                    in_flight[future] = (index, site_attributes, host)
+
+                timeout = None
+                if deferred:
+                    timeout = max(0, deferred[0][0] - time.monotonic())
+
+                if not in_flight:
+                    # Only deferred checks remain (if any); wait until the next one is due
+                    if timeout is not None:
+                        time.sleep(timeout)
+                    continue
+
+                done, _ = concurrent.futures.wait(in_flight, timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index, site_attributes, host = in_flight.pop(future)
+                    host_counts[host] -= 1
+                    if blocked[host]:
+                        pending.appendleft(blocked[host].popleft())
+                        blocked_count -= 1
+
+                    check = future.result()
+                    if not isinstance(check, Exception) and check.retry_time is not None:
+                        heapq.heappush(deferred, (check.retry_time, index, site_attributes, check))
+                    else:
+                        results[index] = (site_attributes, check)
+
+                # Yield any results which are next in the original site order
+                while next_index in results:
+                    yield results.pop(next_index)
+                    next_index += 1
+
+    def due_sites(self):
+        """Yield the sites in 'self.sites' which are due to be checked (all if no scheduler)."""
+        for site_attributes in self.sites:
+            if self.scheduler is None or self.scheduler.is_due(site_attributes[0]):
+                yield site_attributes
+            else:
+                self.not_due += 1
+
+    def run_site_check(self, site_attributes, check=None):
+        """Run a robots.txt check (excluding reports) for a single site.
+
+        Connection retries are deferred rather than waited for; if a retry is required, the
+        returned instance's 'retry_time' is set and it should be passed back in as 'check'.
+
+        Args:
+            site_attributes (list): a list representing a single site's attributes
+            in the form [url, name, email] (refer to 'check_site()').
+            check (None, RobotsCheck): a previously deferred check to retry, otherwise None.
+
+        Returns:
+            The RobotsCheck instance, or the exception raised while initialising
+            the check (which is handled and reported in 'check_site()').
+
+        """
+        try:
+            if check is None:
+                check = RobotsCheck(site_attributes[0].strip().lower())
+            return check.run_check(defer_retries=True)
+
+        except Exception as e:
+            return e
+
+    def check_site(self, site_attributes, check=None):
+        """Run a robots.txt check (unless already completed) and report for a single site.
 
         Attributes:
             site_attributes (list): a list representing a single site's attributes
@@ -102,15 +334,19 @@ class RunChecks:
                 - url (str): the absolute URL of the website homepage, with a trailing slash.
                 - name (str): the website's name identifier (letters/numbers only).
                 - email (str): the email address of the site admin, who will receive alerts.
+            check (None, obj): the result of 'run_site_check()' if the check has already been
+            run, otherwise None (default) to run the check.
 
         """
+        result = "error"
         try:
             url, name, email = site_attributes
-            url = url.strip().lower()
             email = email.strip()
 
-            check = RobotsCheck(url)
-            check.run_check()
+            if check is None:
+                check = RobotsCheck(url.strip().lower()).run_check()
+            elif isinstance(check, Exception):
+                raise check
 
             if check.err_message:
                 report = ErrorReport(check, name, email)
@@ -118,12 +354,15 @@ class RunChecks:
             elif check.first_run:
                 report = FirstRunReport(check, name, email)
                 self.first_run += 1
+                result = "first_run"
             elif check.file_change:
                 report = ChangeReport(check, name, email)
                 self.change += 1
+                result = "change"
             else:
                 report = NoChangeReport(check, name, email)
                 self.no_change += 1
+                result = "no_change"
 
             report.create_reports()
 
@@ -144,10 +383,18 @@ class RunChecks:
             emails.site_emails.append((site_attributes[2].strip(), email_subject, email_body))
             self.error += 1
 
+        if self.scheduler is not None:
+            self.scheduler.record(site_attributes[0], result)
+
     @logs.unexpected_exception_handling
     def reset_counts(self):
         """Reset all report type counts back to zero."""
         self.no_change, self.change, self.first_run, self.error = 0, 0, 0, 0
+        self.not_due = 0
+
+
+class RetryDeferred(Exception):
+    """Raised when a failed robots.txt connection attempt should be retried later."""
 
 
 class RobotsCheck:
@@ -163,11 +410,25 @@ class RobotsCheck:
         first_run (bool): if this is the first recorded check of the website's file.
         err_message (None, str): None by default, otherwise a description of the error.
         file_change (bool): if the robots.txt file has changed since the previous record.
+        not_modified (bool): if the server confirmed (304 status code) that the robots.txt file
+                             hasn't changed since the previous record, so it wasn't downloaded.
+        storage (obj): the storage backend of the site records (refer to storage.py).
+        site_id (str): the site's domain name, used to identify the site's records.
         dir (str): the location of the directory containing website data.
         old_file (str): the file location of the previous check robots.txt content.
         new_file (str): the file location of the latest check robots.txt content.
+        meta_file (str): the file location of the 'ETag'/'Last-Modified' validators and the
+                         fingerprint of the latest check robots.txt content.
+        recorded_meta (dict): the metadata recorded during the previous check, if still
+                              valid (assigned in 'run_check()', refer to 'load_meta()').
+        validators (dict): the validators returned with the latest robots.txt content.
+        fingerprint (list): the latest check robots.txt content fingerprint (refer to
+                            'get_fingerprint()', assigned in 'update_records()').
         old_content (str): the previous check robots.txt content (assigned in 'update_records()').
         new_content (str): the latest check robots.txt content (assigned in 'update_records()').
+        attempts (int): the number of robots.txt URL connection attempts made so far.
+        retry_time (None, float): None by default, otherwise the 'time.monotonic()' time at
+                                  which a deferred connection attempt should be retried.
 
     """
 
@@ -177,26 +438,34 @@ class RobotsCheck:
         self.first_run = False
         self.err_message = None
         self.file_change = False
+        self.not_modified = False
+        self.storage = storage.get_storage()
         # Use site domain name as directory name
         if self.url[:5] == 'https':
-            self.dir = config.PATH + "data/" + self.url[8:-1]
+            self.site_id = self.url[8:-1]
         else:
-            self.dir = config.PATH + "data/" + self.url[7:-1]
-        self.old_file = self.dir + "/program_files/old_file.txt"
-        self.new_file = self.dir + "/program_files/new_file.txt"
+            self.site_id = self.url[7:-1]
+        self.dir = config.PATH + "data/" + self.site_id
+        self.old_file, self.new_file = self.storage.get_content_files(self)
+        self.meta_file = self.dir + "/program_files/new_file_meta.json"
+        self.recorded_meta = {}
+        self.validators = {}
+        self.fingerprint = None
         # Content assigned during 'update_records()' after a successful check
         self.old_content = None
         self.new_content = None
+        # Updated during 'download_robotstxt()'
+        self.attempts = 0
+        self.retry_time = None
 
         if (self.url[:4] != "http") or (self.url[-1] != "/"):
             self.err_message = "{} is not a valid site URL. The site URL must be absolute and " \
                                "end in a slash, e.g. 'https://www.example.com/'.".format(url)
 
-        # If URL is valid and site directory doesn't exist, create required directories
-        elif not os.path.isdir(self.dir):
+        # If URL is valid, create the site directories/records if they don't exist
+        else:
             try:
-                os.mkdir(self.dir)
-                os.mkdir(self.dir + "/program_files")
+                self.storage.prepare_site(self)
 
             except Exception as e:
                 self.err_message = logs.get_err_str(e, "Error creating {} directories."
@@ -206,21 +475,33 @@ class RobotsCheck:
     def __str__(self):
         return "RobotsCheck - {}".format(type(self).__name__, self.url)
 
-    def run_check(self):
+    def run_check(self, defer_retries=False):
         """Update the robots.txt file records and check for changes.
 
+        Args:
+            defer_retries (bool): whether a failed connection attempt should end the check
+                                  with 'self.retry_time' set, rather than waiting to retry.
+                                  Calling this method again continues the check.
+
         Returns:
-            The class instance representing the completed robots.txt check.
+            The class instance representing the completed (or deferred) robots.txt check.
         """
+        self.retry_time = None
         if self.err_message:
             # If error/invalid URL during __init__
             return self
 
         try:
-            extraction = self.download_robotstxt()
-            self.update_records(extraction)
-            if not self.first_run:
-                self.check_diff()
+            self.recorded_meta = self.storage.load_meta(self)
+            extraction = self.download_robotstxt(defer_retries=defer_retries)
+            if not self.not_modified:
+                self.update_records(extraction)
+                self.update_meta()
+                if not self.first_run:
+                    self.check_diff()
+
+        except RetryDeferred:
+            pass
 
         except Exception as e:
             # Anticipated errors caught in 'download_robotstxt()' and logged in 'self.err_message'
@@ -232,29 +513,37 @@ class RobotsCheck:
 
         return self
 
-    def download_robotstxt(self, max_attempts=5, wait=120):
+    def download_robotstxt(self, max_attempts=5, wait=120, defer_retries=False):
         """Extract and return the current content (str) of the robots.txt file.
 
+        If the server confirms that the file hasn't changed (304 status code) in response to
+        a conditional request, 'self.not_modified' is set to True and None is returned.
+
         Args:
             max_attempts (int): the maximum number of robots.txt URL connection attempts.
             wait (int): the number of seconds between connection attempts.
+            defer_retries (bool): whether to raise RetryDeferred (after setting
+                                  'self.retry_time') instead of waiting between attempts.
 
         """
         robots_url = self.url + "robots.txt"
+        conditional_headers = self.get_conditional_headers()
 
-        for attempt in range(max_attempts):
+        while True:
+            self.attempts += 1
             attempts_str = " Trying again in {} seconds. " \
-                           "Attempt {} of {}.".format(wait, attempt + 1, max_attempts)
+                           "Attempt {} of {}.".format(wait, self.attempts, max_attempts)
 
             try:
-                headers = {'User-Agent': config.USER_AGENT}
-                req = requests.get(robots_url, headers=headers, allow_redirects=False, timeout=40)
+                # The shared session sets the user-agent and reuses open connections
+                req = fetching.get_session().get(robots_url, headers=conditional_headers,
+                                                 allow_redirects=False, timeout=40)
 
             except requests.exceptions.Timeout as e:
                 err = "{} timed out before sending a valid response.".format(robots_url)
-                if attempt < (max_attempts - 1):
+                if self.attempts < max_attempts:
                     print(err + attempts_str)
-                    time.sleep(wait)
+                    self.wait_for_retry(wait, defer_retries)
                 else:
                     # Final connection attempt failed
                     self.err_message = logs.get_err_str(e, err, trace=False)
@@ -262,9 +551,9 @@ class RobotsCheck:
 
             except requests.exceptions.ConnectionError as e:
                 err = "There was a connection error when accessing {}.".format(robots_url)
-                if attempt < (max_attempts - 1):
+                if self.attempts < max_attempts:
                     print(err + attempts_str)
-                    time.sleep(wait)
+                    self.wait_for_retry(wait, defer_retries)
                 else:
                     # Final connection attempt failed
                     self.err_message = logs.get_err_str(e, err)
@@ -273,49 +562,80 @@ class RobotsCheck:
 
             else:
                 # If no exceptions raised
+                if req.status_code == 304 and conditional_headers:
+                    self.not_modified = True
+                    return None
+
                 if req.status_code != 200:
                     self.err_message = "{} returned a {} status code." \
                                        "".format(robots_url, req.status_code)
                     raise requests.exceptions.HTTPError
 
                 # URL was successfully reached and returned a 200 status code
+                self.validators = {'etag': req.headers.get('ETag'),
+                                   'last_modified': req.headers.get('Last-Modified')}
                 return req.text
 
+    def wait_for_retry(self, wait, defer_retries):
+        """Wait (or defer) before the next robots.txt URL connection attempt.
+
+        Args:
+            wait (int): the number of seconds before the next connection attempt.
+            defer_retries (bool): whether to set 'self.retry_time' and raise RetryDeferred
+                                  instead of sleeping.
+
+        """
+        if defer_retries:
+            self.retry_time = time.monotonic() + wait
+            raise RetryDeferred("{}robots.txt will be retried in {} seconds."
+                                "".format(self.url, wait))
+
+        time.sleep(wait)
+
+    def get_conditional_headers(self):
+        """Return the conditional request headers (dict) based on the recorded validators."""
+        headers = {}
+        if self.recorded_meta.get('etag'):
+            headers['If-None-Match'] = self.recorded_meta['etag']
+        if self.recorded_meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.recorded_meta['last_modified']
+
+        return headers
+
+    def update_meta(self):
+        """Record the validators and fingerprint of the latest robots.txt content."""
+        meta = {'etag': self.validators.get('etag'),
+                'last_modified': self.validators.get('last_modified'),
+                'fingerprint': self.fingerprint}
+
+        self.storage.save_meta(self, meta)
+
     def update_records(self, new_extraction):
-        """Update the files and attributes containing the current and previous robots.txt content.
+        """Update the records and attributes containing the current and previous robots.txt content.
 
-        If the robots.txt file has been successfully checked previously, overwrite the contents
-        of 'self.old_file' with the contents of 'self.new_file' (from the previous check).
-        Otherwise, create the content files and set 'self.first_run' = True. Then, add the new
-        robots.txt extraction content to 'self.new_file'. During this process, 'self.old_content'
-        and 'self.new_content' are also updated by reading from the updated files.
+        If the fingerprint of the new robots.txt extraction matches the recorded fingerprint of
+        the latest content, the content is unchanged and the records aren't updated. Otherwise,
+        the new content replaces the latest content in the records (refer to the storage
+        backend's 'replace_content()'), and 'self.first_run' = True if there was no previous
+        content. During this process, 'self.old_content' and 'self.new_content' are updated.
 
         Args:
             new_extraction (str): the current content of the robots.txt file.
 
         """
-        if os.path.isfile(self.new_file):
-            # Overwrite the contents of old_file with the contents of new_file
-            with open(self.old_file, 'w') as old, open(self.new_file, 'r') as new:
-                self.old_content = new.read()
-                old.write(self.old_content)
+        # Compare content as it would be read back to avoid reading-related inconsistencies
+        self.new_content = normalise_content(new_extraction)
+        self.fingerprint = get_fingerprint(self.new_content)
 
-        else:
-            # Create robots.txt content files if they don't exist (first non-error run)
-            with open(self.old_file, 'x'), open(self.new_file, 'x'):
-                pass
+        if self.fingerprint == self.recorded_meta.get('fingerprint'):
+            # Unchanged since the previous check
+            self.old_content = self.new_content
+            return
 
+        self.old_content = self.storage.replace_content(self, new_extraction)
+        if self.old_content is None:
             self.first_run = True
 
-        # Overwrite the contents of new_file with new_extraction
-        # Characters which can't be encoded are replaced with an escape sequence
-        with open(self.new_file, 'w', errors='backslashreplace') as new:
-            new.write(new_extraction)
-
-        # Read content from both files to avoid reading-related comparison inconsistencies
-        with open(self.new_file, 'r') as new:
-            self.new_content = new.read()
-
     def check_diff(self):
         """Check for robots.txt content differences and update 'self.file_change'."""
         if self.old_content != self.new_content:
@@ -327,6 +647,8 @@ class Report:
 
     Attributes:
         url (str): the absolute URL of the website homepage, with a trailing slash.
+        storage (obj): the storage backend of the site records (refer to storage.py).
+        site_id (str): the site's domain name, used to identify the site's records.
         dir (str): the name of the directory containing website data.
         new_content (str): the latest check robots.txt content.
         name (str): the website's name identifier (letters/numbers only).
@@ -337,6 +659,8 @@ class Report:
 
     def __init__(self, website, name, email):
         self.url = website.url
+        self.storage = website.storage
+        self.site_id = website.site_id
         self.dir = website.dir
         self.new_content = website.new_content
         self.name = name
@@ -349,25 +673,14 @@ class Report:
 
     @logs.unexpected_exception_handling
     def update_site_log(self, message):
-        """Update the site log text file with a single message (str)."""
-        log_file = self.dir + "/log.txt"
+        """Update the site log with a single message (str)."""
         entry = "{}: {}".format(self.log_timestamp, message)
-
-        # Prepend the new entry or create file if it doesn't exist
-        logs.prepend_to_file(log_file, entry)
+        self.storage.append_site_log(self, entry)
 
     @logs.unexpected_exception_handling
     def create_snapshot(self):
-        """Create and return the location of a text file containing the latest content."""
-        file_name = self.file_timestamp + " Robots.txt Snapshot.txt"
-        snapshot_file = self.dir + "/snapshots/" + file_name
-        if not os.path.isdir(self.dir + "/snapshots"):
-            os.mkdir(self.dir + "/snapshots")
-
-        with open(snapshot_file, 'x') as f:
-            f.write(self.new_content)
-
-        return snapshot_file
+        """Create and return the location of a snapshot of the latest content."""
+        return self.storage.save_snapshot(self, self.new_content)
 
 
 class NoChangeReport(Report):
@@ -404,6 +717,7 @@ class ChangeReport(Report):
         print(log_content)
         self.create_snapshot()
         diff_file = self.create_diff_file()
+        self.storage.export_content_files(self)
         email_subject = "{} Robots.txt Change".format(self.name)
         link = "<a href=\"{}\">{}</a>".format(self.url + "robots.txt", self.url + "robots.txt")
         email_content = "A change has been detected in the {} robots.txt file. " \
@@ -417,20 +731,12 @@ class ChangeReport(Report):
 
     @logs.unexpected_exception_handling
     def create_diff_file(self):
-        """Create and return the location of an HTML file containing a diff table."""
+        """Create and return the location of an HTML file containing a diff of the changes."""
         old_list = self.old_content.split('\n')
         new_list = self.new_content.split('\n')
-        diff_html = difflib.HtmlDiff().make_file(old_list, new_list, "Previous", "New")
-
-        file_name = self.file_timestamp + " Robots.txt Diff.html"
-        diff_file = self.dir + "/snapshots/" + file_name
-        if not os.path.isdir(self.dir + "/snapshots"):
-            os.mkdir(self.dir + "/snapshots")
+        diff_html = diffs.html_diff(old_list, new_list, from_label="Previous", to_label="New")
 
-        with open(diff_file, 'x') as f:
-            f.write(diff_html)
-
-        return diff_file
+        return self.storage.save_diff(self, diff_html)
 
 
 class FirstRunReport(Report):
@@ -470,8 +776,8 @@ class ErrorReport(Report):
     def create_reports(self):
         """Update site log, update main log, print result, and prepare email."""
         log_content = "Error: {}. {}".format(self.url, self.err_message)
-        # Only create/update site log if site directory exists
-        if (os.path.isdir(self.dir)) and (self.dir[-5:] != "data/"):
+        # Only create/update site log if site directory/record exists
+        if self.storage.site_exists(self):
             self.update_site_log(log_content)
         logs.update_main_log(log_content)
         print(log_content)
@@ -485,17 +791,27 @@ class ErrorReport(Report):
         emails.site_emails.append((self.email, email_subject, email_body))
 
 
-def main():
-    """Run all checks and handle fatal errors."""
+def create_data_dir():
+    """Create /data and the main log file if they don't already exist."""
+    if not os.path.isdir(config.PATH + 'data'):
+        os.mkdir(config.PATH + 'data')
+        f = open(config.MAIN_LOG, 'x')
+        f.close()
+
+
+def main(shard=None):
+    """Run all checks and handle fatal errors.
+
+    Args:
+        shard (None, tuple): if set, only check sites in the shard, in the form
+        (shard number, shard count) (refer to 'in_shard()').
+
+    """
     try:
-        # Create /data and main log file if they don't already exist
-        if not os.path.isdir(config.PATH + 'data'):
-            os.mkdir(config.PATH + 'data')
-            f = open(config.MAIN_LOG, 'x')
-            f.close()
-        
-        sites_data = sites_from_file(config.MONITORED_SITES)
-        RunChecks(sites_data).check_all()
+        create_data_dir()
+        sites_data = iter_sites(config.MONITORED_SITES, shard)
+        scheduler = scheduling.Scheduler(storage.get_storage(), shard)
+        RunChecks(sites_data, scheduler).check_all()
 
     except Exception as fatal_err:
         fatal_err_msg = logs.get_err_str(fatal_err, "Fatal error.")
@@ -514,9 +830,14 @@ def main():
         else:
             print("Note: the sending of emails is disabled in config.py.")
 
-        end_line = "\n{}END OF RUN{}\n".format("-"*20, "-"*20)
+        end_line = "\n{}\n".format(logs.END_OF_RUN)
         logs.update_main_log(end_line, include_timestamp=False)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Monitor changes across one or more "
+                                                 "robots.txt files.")
+    parser.add_argument('--shard', type=parse_shard, metavar='i/n',
+                        help="only check the i-th of n disjoint subsets of the monitored sites")
+    args = parser.parse_args()
+    main(shard=args.shard)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import config
+import logs
+
+
+class Scheduler:
+    """Record the check history of each site and decide which sites are due to be checked.
+
+    After each check, a site's check interval is updated based on the result:
+        - change or first run: the interval is reset to 'config.SCHEDULE_MIN_INTERVAL', so
+          that sites which have recently changed are checked often.
+        - no change: the interval is multiplied by 'config.SCHEDULE_BACKOFF', up to
+          'config.SCHEDULE_MAX_INTERVAL', so that stable sites are checked less often.
+        - error: the site is re-checked after 'config.SCHEDULE_MIN_INTERVAL', doubling for
+          each consecutive error (up to the maximum interval).
+
+    If 'config.ADAPTIVE_SCHEDULE' is False, history is still recorded but all sites are due.
+    The history is saved using the storage backend's state methods (refer to storage.py).
+
+    Attributes:
+        storage (obj): the storage backend (refer to 'storage.get_storage()').
+        state_name (str): the name of the saved state.
+        now (float): the time ('time.time()') used for due times if no time is specified.
+        sites (dict): the history of each site, in the form {url: history (dict)}.
+        seen (set): the URLs of sites passed to 'is_due()' (other sites are removed on save).
+
+    """
+
+    def __init__(self, storage, shard=None, now=None):
+        self.storage = storage
+        self.state_name = "schedule"
+        if shard is not None:
+            # Each shard is checked by a separate process, so the history is saved separately
+            self.state_name += "-{}-of-{}".format(*shard)
+
+        self.now = time.time() if now is None else now
+        self.sites = storage.load_state(self.state_name)
+        self.seen = set()
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return "{} - {}".format(type(self).__name__, self.state_name)
+
+    def get_due_time(self, url):
+        """Return the time (float) that a site (str URL) is next due to be checked.
+
+        Sites with no history are due immediately (0). If 'config.ADAPTIVE_SCHEDULE' is False,
+        sites are due 'config.SCHEDULE_MIN_INTERVAL' seconds after their last check.
+        """
+        url = url.strip().lower()
+        with self.lock:
+            self.seen.add(url)
+            history = self.sites.get(url)
+
+        if history is None:
+            return 0
+        elif not config.ADAPTIVE_SCHEDULE:
+            return history['last_checked'] + config.SCHEDULE_MIN_INTERVAL
+
+        return history['next_due']
+
+    def is_due(self, url, now=None):
+        """Return True if the site (str URL) is due to be checked, otherwise False.
+
+        A site is due if it has no history or if its next due time is within half of the
+        minimum interval of 'now', so that small variations in run start times (e.g. cron
+        jobs) don't delay checks by a full run.
+        """
+        url = url.strip().lower()
+        now = self.now if now is None else now
+        with self.lock:
+            self.seen.add(url)
+            history = self.sites.get(url)
+
+        if not config.ADAPTIVE_SCHEDULE or history is None:
+            return True
+
+        return history['next_due'] <= now + config.SCHEDULE_MIN_INTERVAL / 2
+
+    @logs.unexpected_exception_handling
+    def record(self, url, result, now=None):
+        """Record the result of a site check and update the site's next due time.
+
+        Args:
+            url (str): the site URL.
+            result (str): the check result: "change", "first_run", "no_change", or "error".
+            now (float): the time of the check (defaults to 'self.now').
+
+        """
+        url = url.strip().lower()
+        now = self.now if now is None else now
+        min_interval = config.SCHEDULE_MIN_INTERVAL
+        max_interval = config.SCHEDULE_MAX_INTERVAL
+        with self.lock:
+            history = self.sites.setdefault(url, {
+                'interval': min_interval, 'last_checked': None, 'last_change': None,
+                'changes': 0, 'errors': 0, 'consecutive_errors': 0, 'next_due': now})
+
+            history['last_checked'] = now
+            if result == "error":
+                history['errors'] += 1
+                history['consecutive_errors'] += 1
+                retry_interval = min_interval * 2 ** (history['consecutive_errors'] - 1)
+                history['next_due'] = now + min(retry_interval, max_interval)
+                return
+
+            history['consecutive_errors'] = 0
+            if result in ("change", "first_run"):
+                if result == "change":
+                    history['changes'] += 1
+                history['last_change'] = now
+                history['interval'] = min_interval
+            else:
+                history['interval'] = min(history['interval'] * config.SCHEDULE_BACKOFF,
+                                          max_interval)
+
+            history['next_due'] = now + history['interval']
+
+    def get_next_due(self):
+        """Return the earliest next due time (float) of the seen sites, or None if none."""
+        with self.lock:
+            due_times = [self.sites[url]['next_due'] for url in self.seen if url in self.sites]
+
+        return min(due_times, default=None)
+
+    @logs.unexpected_exception_handling
+    def save(self):
+        """Save the history of all seen sites (removing sites which are no longer monitored)."""
+        with self.lock:
+            self.sites = {url: history for url, history in self.sites.items()
+                          if url in self.seen}
+            self.storage.save_state(self.state_name, self.sites)
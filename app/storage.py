@@ -0,0 +1,400 @@
+import json
+import os
+import sqlite3
+import threading
+
+import blobs
+import config
+import logs
+
+# The shared storage backend (see 'get_storage()')
+storage = None
+storage_lock = threading.Lock()
+
+
+class FileStorage:
+    """Store site records, logs, and snapshots in a directory per site (default backend).
+
+    Each site directory (/data/<domain>/) contains the following:
+        - program_files/: the latest and previous robots.txt content, and the metadata
+                          (validators and fingerprint) of the latest content.
+        - log.txt: the site log.
+        - snapshots/: timestamped snapshots and diffs (refer to 'config.SNAPSHOT_STORE').
+
+    Other saved state (e.g. the check schedule) is stored as JSON files in /data/_state/.
+
+    Methods which take a 'site' argument accept a RobotsCheck or Report instance.
+    """
+
+    def __str__(self):
+        return type(self).__name__
+
+    def prepare_site(self, check):
+        """Create the site directories if they don't exist."""
+        if not os.path.isdir(check.dir):
+            os.mkdir(check.dir)
+            os.mkdir(check.dir + "/program_files")
+
+    def site_exists(self, site):
+        """Return whether the site has been prepared (bool), i.e. the site directory exists."""
+        return os.path.isdir(site.dir) and (site.dir[-5:] != "data/")
+
+    def get_content_files(self, check):
+        """Return the locations of the previous and latest content files (tuple of str)."""
+        return check.dir + "/program_files/old_file.txt", check.dir + "/program_files/new_file.txt"
+
+    def load_meta(self, check):
+        """Return the recorded validators and fingerprint (dict) of the latest content.
+
+        The recorded data is only returned if 'check.new_file' is unchanged since it was
+        recorded (based on its size and modification time), so that a 304 status code or
+        matching fingerprint always means that the recorded content is still accurate.
+        Otherwise (e.g. first run), an empty dict is returned.
+        """
+        try:
+            with open(check.meta_file, 'r') as f:
+                meta = json.load(f)
+            new_file_stat = os.stat(check.new_file)
+
+        except (OSError, ValueError):
+            return {}
+
+        if meta.get('new_file_stat') != [new_file_stat.st_size, new_file_stat.st_mtime_ns]:
+            return {}
+
+        return meta
+
+    def save_meta(self, check, meta):
+        """Record the metadata (dict) of the latest content, if changed."""
+        new_file_stat = os.stat(check.new_file)
+        meta = {**meta, 'new_file_stat': [new_file_stat.st_size, new_file_stat.st_mtime_ns]}
+        if meta != check.recorded_meta:
+            with open(check.meta_file, 'w') as f:
+                json.dump(meta, f)
+
+    def replace_content(self, check, new_extraction):
+        """Record new robots.txt content and return the previous content.
+
+        If the robots.txt file has been successfully checked previously, replace
+        'check.old_file' with 'check.new_file' (from the previous check). Otherwise, create
+        the content files. Then, add the new robots.txt extraction to 'check.new_file'.
+
+        Args:
+            check (RobotsCheck): the robots.txt check.
+            new_extraction (str): the current content of the robots.txt file.
+
+        Returns:
+            The previous content (str), or None if this is the first successful check.
+        """
+        old_content = None
+        if os.path.isfile(check.new_file):
+            with open(check.new_file, 'r') as new:
+                old_content = new.read()
+            os.replace(check.new_file, check.old_file)
+
+        else:
+            # Create robots.txt content files if they don't exist (first non-error run)
+            with open(check.old_file, 'x'), open(check.new_file, 'x'):
+                pass
+
+        # Overwrite the contents of new_file with new_extraction
+        # Characters which can't be encoded are replaced with an escape sequence
+        with open(check.new_file, 'w', errors='backslashreplace') as new:
+            new.write(new_extraction)
+
+        return old_content
+
+    def export_content_files(self, report):
+        """Ensure the content files exist (e.g. for email attachments); no action required."""
+        pass
+
+    def append_site_log(self, report, entry):
+        """Append an entry (str) to the site log, creating the log if it doesn't exist."""
+        logs.append_to_log(report.dir + "/log.txt", entry)
+
+    def save_snapshot(self, report, content):
+        """Create and return the location of a text file containing the latest content (str).
+
+        If 'config.SNAPSHOT_STORE' is "blobs", the content is added to the blob store and the
+        location of a reference file (containing the content hash) is returned instead.
+        """
+        if not os.path.isdir(report.dir + "/snapshots"):
+            os.mkdir(report.dir + "/snapshots")
+
+        file_name = report.file_timestamp + " Robots.txt Snapshot"
+        if config.SNAPSHOT_STORE == "blobs":
+            ref_file = report.dir + "/snapshots/" + file_name + ".ref"
+            blobs.write_ref(ref_file, content)
+            return ref_file
+
+        snapshot_file = report.dir + "/snapshots/" + file_name + ".txt"
+        with open(snapshot_file, 'x') as f:
+            f.write(content)
+
+        return snapshot_file
+
+    def save_diff(self, report, diff_html):
+        """Create and return the location of an HTML file containing a diff table (str).
+
+        If 'config.SNAPSHOT_STORE' is "blobs", the diff is added to the blob store (referenced
+        from /snapshots/) and the returned file is the latest diff in /program_files/.
+        """
+        if not os.path.isdir(report.dir + "/snapshots"):
+            os.mkdir(report.dir + "/snapshots")
+
+        file_name = report.file_timestamp + " Robots.txt Diff"
+        if config.SNAPSHOT_STORE == "blobs":
+            blobs.write_ref(report.dir + "/snapshots/" + file_name + ".ref", diff_html)
+            # Only the latest diff is kept as a file (e.g. for email attachments)
+            diff_file = report.dir + "/program_files/diff.html"
+            with open(diff_file, 'w') as f:
+                f.write(diff_html)
+
+            return diff_file
+
+        diff_file = report.dir + "/snapshots/" + file_name + ".html"
+        with open(diff_file, 'x') as f:
+            f.write(diff_html)
+
+        return diff_file
+
+    def load_state(self, name):
+        """Return a saved state (dict) by name (str), or an empty dict if it doesn't exist."""
+        try:
+            with open(config.PATH + "data/_state/" + name + ".json", 'r') as f:
+                return json.load(f)
+
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, name, state):
+        """Save a state (dict) by name (str), replacing any previous state of the same name."""
+        state_file = config.PATH + "data/_state/" + name + ".json"
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        temp_file = state_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(state, f)
+
+        os.replace(temp_file, state_file)
+
+    def flush(self):
+        """Ensure all updates are saved; no action required as files are written directly."""
+        pass
+
+
+class SQLiteStorage:
+    """Store site records, logs, and snapshot metadata in a single SQLite database.
+
+    The database is used in WAL mode, and updates are committed in batches (every
+    'batch_size' updates and during 'flush()') rather than after every update. Snapshot
+    and diff content is stored in the blob store (refer to blobs.py), and the content files
+    required for email attachments are only created when required, in /data/_attachments/.
+    The methods are the same as FileStorage, with additional methods for reading records.
+
+    Attributes:
+        db_file (str): the location of the SQLite database file.
+        batch_size (int): the maximum number of uncommitted updates.
+        pending (int): the number of uncommitted updates.
+
+    """
+
+    def __init__(self, db_file, batch_size=500):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.pending = 0
+        self.lock = threading.Lock()
+        # The connection is shared by check threads, with access serialised by 'self.lock'
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS sites (
+                site_id TEXT PRIMARY KEY,
+                old_content TEXT,
+                new_content TEXT,
+                meta TEXT
+            );
+            CREATE TABLE IF NOT EXISTS site_logs (
+                id INTEGER PRIMARY KEY,
+                site_id TEXT NOT NULL,
+                entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS site_logs_site_id ON site_logs (site_id, id);
+            CREATE TABLE IF NOT EXISTS snapshots (
+                site_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (site_id, timestamp, kind)
+            );
+            CREATE TABLE IF NOT EXISTS state (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def __str__(self):
+        return "{} - {}".format(type(self).__name__, self.db_file)
+
+    def execute(self, sql, params=(), update=False):
+        """Execute an SQL statement and return all result rows (list of tuples).
+
+        Args:
+            sql (str): the SQL statement.
+            params (tuple): the statement parameters.
+            update (bool): whether the statement is an update, to be committed in a batch.
+
+        """
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+            if update:
+                self.pending += 1
+                if self.pending >= self.batch_size:
+                    self.connection.commit()
+                    self.pending = 0
+
+        return rows
+
+    def prepare_site(self, check):
+        """Add the site record if it doesn't exist."""
+        self.execute("INSERT OR IGNORE INTO sites (site_id) VALUES (?)", (check.site_id,),
+                     update=True)
+
+    def site_exists(self, site):
+        """Return whether the site has been prepared (bool), i.e. the site record exists."""
+        return bool(self.execute("SELECT 1 FROM sites WHERE site_id = ?", (site.site_id,)))
+
+    def get_content_files(self, check):
+        """Return the locations of the previous and latest content attachment files (tuple)."""
+        attachments_dir = config.PATH + "data/_attachments/" + check.site_id
+        return attachments_dir + "/old_file.txt", attachments_dir + "/new_file.txt"
+
+    def load_meta(self, check):
+        """Return the recorded validators and fingerprint (dict) of the latest content."""
+        rows = self.execute("SELECT meta FROM sites WHERE site_id = ?", (check.site_id,))
+        if rows and rows[0][0]:
+            return json.loads(rows[0][0])
+
+        return {}
+
+    def save_meta(self, check, meta):
+        """Record the metadata (dict) of the latest content, if changed."""
+        if meta != check.recorded_meta:
+            self.execute("UPDATE sites SET meta = ? WHERE site_id = ?",
+                         (json.dumps(meta), check.site_id), update=True)
+
+    def replace_content(self, check, new_extraction):
+        """Record new robots.txt content and return the previous content.
+
+        The normalised content ('check.new_content') is stored, i.e. the content as it would
+        be read back from a content file.
+
+        Args:
+            check (RobotsCheck): the robots.txt check.
+            new_extraction (str): the current content of the robots.txt file.
+
+        Returns:
+            The previous content (str), or None if this is the first successful check.
+        """
+        rows = self.execute("SELECT new_content FROM sites WHERE site_id = ?", (check.site_id,))
+        old_content = rows[0][0] if rows else None
+        self.execute("UPDATE sites SET old_content = ?, new_content = ? WHERE site_id = ?",
+                     (old_content or "", check.new_content, check.site_id), update=True)
+
+        return old_content
+
+    def export_content_files(self, report):
+        """Write the previous and latest content to the content attachment files."""
+        rows = self.execute("SELECT old_content, new_content FROM sites WHERE site_id = ?",
+                            (report.site_id,))
+        old_file, new_file = self.get_content_files(report)
+        os.makedirs(os.path.dirname(old_file), exist_ok=True)
+        for file_path, content in zip((old_file, new_file), rows[0]):
+            with open(file_path, 'w', errors='backslashreplace') as f:
+                f.write(content)
+
+    def append_site_log(self, report, entry):
+        """Add an entry (str) to the site log."""
+        self.execute("INSERT INTO site_logs (site_id, entry) VALUES (?, ?)",
+                     (report.site_id, entry), update=True)
+
+    def get_site_log(self, site_id):
+        """Return a list of site log entries (str), newest first."""
+        rows = self.execute("SELECT entry FROM site_logs WHERE site_id = ? ORDER BY id DESC",
+                            (site_id,))
+        return [row[0] for row in rows]
+
+    def add_snapshot_blob(self, report, kind, content):
+        """Add content (str) to the blob store and record the snapshot metadata.
+
+        Args:
+            report (Report): the report creating the snapshot.
+            kind (str): the snapshot type, either "snapshot" or "diff".
+            content (str): the snapshot content.
+
+        Returns:
+            The content hash (str).
+        """
+        blob_hash = blobs.get_store().put(content.encode('utf-8', errors='backslashreplace'))
+        try:
+            self.execute("INSERT INTO snapshots (site_id, timestamp, kind, hash) "
+                         "VALUES (?, ?, ?, ?)", (report.site_id, report.file_timestamp,
+                                                 kind, blob_hash), update=True)
+        except sqlite3.IntegrityError:
+            # A snapshot already exists for the same site and timestamp
+            blobs.get_store().release(blob_hash)
+            raise
+
+        return blob_hash
+
+    def save_snapshot(self, report, content):
+        """Store the latest content (str) and return its hash (str)."""
+        return self.add_snapshot_blob(report, "snapshot", content)
+
+    def save_diff(self, report, diff_html):
+        """Store a diff (str) and return the location of the diff attachment file (str)."""
+        self.add_snapshot_blob(report, "diff", diff_html)
+        diff_file = config.PATH + "data/_attachments/" + report.site_id + "/diff.html"
+        os.makedirs(os.path.dirname(diff_file), exist_ok=True)
+        with open(diff_file, 'w') as f:
+            f.write(diff_html)
+
+        return diff_file
+
+    def get_snapshots(self, site_id, kind="snapshot"):
+        """Return a list of snapshots in the form (timestamp, hash), oldest first."""
+        return self.execute("SELECT timestamp, hash FROM snapshots WHERE site_id = ? "
+                            "AND kind = ? ORDER BY timestamp", (site_id, kind))
+
+    def load_state(self, name):
+        """Return a saved state (dict) by name (str), or an empty dict if it doesn't exist."""
+        rows = self.execute("SELECT value FROM state WHERE name = ?", (name,))
+        return json.loads(rows[0][0]) if rows else {}
+
+    def save_state(self, name, state):
+        """Save a state (dict) by name (str), replacing any previous state of the same name."""
+        self.execute("INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)",
+                     (name, json.dumps(state)), update=True)
+
+    def flush(self):
+        """Commit all pending updates."""
+        with self.lock:
+            self.connection.commit()
+            self.pending = 0
+
+
+def get_storage():
+    """Return the shared storage backend based on 'config.STORAGE_BACKEND'.
+
+    The backend is created during the first call: FileStorage if "files",
+    or SQLiteStorage (/data/robots_monitor.sqlite3) if "sqlite".
+    """
+    global storage
+    with storage_lock:
+        if storage is None:
+            if config.STORAGE_BACKEND == "sqlite":
+                storage = SQLiteStorage(config.PATH + "data/robots_monitor.sqlite3")
+            else:
+                storage = FileStorage()
+
+    return storage
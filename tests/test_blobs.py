@@ -0,0 +1,44 @@
+import gzip
+import os
+
+
+def test_blob_store(tmp_path):
+    from app.blobs import BlobStore
+
+    store = BlobStore(str(tmp_path / "_blobs"))
+    first_hash = store.put(b"User-agent: *\nDisallow: /a\n")
+    second_hash = store.put(b"User-agent: *\nDisallow: /b\n")
+
+    # Identical content is only stored once, compressed
+    assert store.put(b"User-agent: *\nDisallow: /a\n") == first_hash
+    with gzip.open(store.get_path(first_hash), 'rb') as f:
+        assert f.read() == b"User-agent: *\nDisallow: /a\n"
+
+    assert store.refs == {first_hash: 2, second_hash: 1}
+    assert BlobStore(str(tmp_path / "_blobs")).refs == store.refs
+
+    # Blobs are deleted once no longer referenced
+    store.release(first_hash)
+    assert store.get(first_hash) == b"User-agent: *\nDisallow: /a\n"
+    store.release(first_hash)
+    assert not os.path.isfile(store.get_path(first_hash))
+    assert store.refs == {second_hash: 1}
+
+
+def test_snapshot_refs(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.blobs as blobs
+
+    monkeypatch.setattr(blobs, "store", blobs.BlobStore(str(tmp_path / "_blobs")))
+
+    ref_files = [str(tmp_path / "{} Robots.txt Snapshot.ref".format(i)) for i in range(3)]
+    for ref_file, content in zip(ref_files, ["A\n", "B\n", "A\n"]):
+        blobs.write_ref(ref_file, content)
+
+    assert [blobs.read_ref(ref_file) for ref_file in ref_files] == ["A\n", "B\n", "A\n"]
+    assert sorted(blobs.store.refs.values()) == [1, 2]
+
+    blobs.delete_ref(ref_files[1])
+    assert not os.path.isfile(ref_files[1])
+    assert list(blobs.store.refs.values()) == [2]
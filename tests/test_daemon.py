@@ -0,0 +1,55 @@
+def test_daemon_spreads_checks(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.main as main_module
+    from app.daemon import Daemon
+
+    config = main_module.config
+    monkeypatch.setattr(config, "PATH", str(tmp_path) + "/")
+    monkeypatch.setattr(config, "MAIN_LOG", str(tmp_path) + "/data/main_log.txt")
+    monkeypatch.setattr(config, "MONITORED_SITES", str(tmp_path) + "/sites.csv")
+    monkeypatch.setattr(config, "DAEMON_TICK", 60)
+    monkeypatch.setattr(config, "SCHEDULE_MIN_INTERVAL", 300)
+    main_module.create_data_dir()
+
+    rows = ["https://www.example{}.com/,Example {},".format(i, i) for i in range(10)]
+    (tmp_path / "sites.csv").write_text("URL,Name,Email\n" + "\n".join(rows) + "\n")
+
+    checked = []
+
+    class MockRobotsCheck:
+        def __init__(self, url):
+            self.url = url
+            self.retry_time = None
+            self.err_message, self.first_run, self.file_change = None, False, False
+
+        def run_check(self, defer_retries=False):
+            checked.append(self.url)
+            return self
+
+    class MockReport:
+        def __init__(self, check, name, email):
+            pass
+
+        def create_reports(self):
+            pass
+
+    monkeypatch.setattr(main_module, "RobotsCheck", MockRobotsCheck)
+    monkeypatch.setattr(main_module, "NoChangeReport", MockReport)
+
+    # Each tick checks enough sites to check every site once per minimum interval
+    daemon = Daemon()
+    daemon.check_due_sites()
+    assert len(checked) == 2
+    for _ in range(4):
+        daemon.check_due_sites()
+    assert sorted(checked) == sorted("https://www.example{}.com/".format(i) for i in range(10))
+
+    # No sites are due again until the minimum interval has passed
+    daemon.check_due_sites()
+    assert len(checked) == 10
+    assert daemon.checks.no_change == 10
+
+    daemon.report()
+    with open(config.MAIN_LOG) as f:
+        assert "No change: 10." in f.read()
@@ -0,0 +1,57 @@
+import difflib
+import random
+
+
+def test_opcodes(monkeypatch):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+    from app import diffs
+
+    rand = random.Random(0)
+    for _ in range(500):
+        old = [rand.choice("abcde") for _ in range(rand.randint(0, 30))]
+        new = [rand.choice("abcde") for _ in range(rand.randint(0, 30))]
+        opcodes = diffs.get_opcodes(old, new)
+
+        # The opcodes cover both sequences and turn the old lines into the new lines
+        result, i, j = [], 0, 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            assert (i1, j1) == (i, j)
+            if tag == "equal":
+                assert old[i1:i2] == new[j1:j2]
+            result += new[j1:j2]
+            i, j = i2, j2
+        assert (i, j) == (len(old), len(new))
+        assert result == new
+
+        # The diff is minimal (at least as many matching lines as difflib finds)
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        matches = sum(size for _, _, size in matcher.get_matching_blocks())
+        assert sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == "equal") >= matches
+        assert diffs.group_opcodes(matcher.get_opcodes(), 2) == [
+            g for g in matcher.get_grouped_opcodes(2) if any(op[0] != "equal" for op in g)]
+
+
+def test_diff_output(monkeypatch):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+    from app import diffs
+
+    old = ["User-agent: *"] + ["Disallow: /{}".format(i) for i in range(1000)]
+    new = list(old)
+    new[1] = "Disallow: /<changed>"
+    new.append("Sitemap: https://www.example.com/sitemap.xml")
+
+    assert diffs.unified_diff(old, new, context=1) == (
+        "--- Previous\n+++ New\n"
+        "@@ -1,3 +1,3 @@\n User-agent: *\n-Disallow: /0\n+Disallow: /<changed>\n Disallow: /1\n"
+        "@@ -1001,1 +1001,2 @@\n Disallow: /999\n+Sitemap: https://www.example.com/sitemap.xml\n")
+
+    # Only changed lines and their context are included in the HTML diff
+    diff_html = diffs.html_diff(old, new, context=1)
+    assert '<span class="diff_sub">Disallow: /0</span>' in diff_html
+    assert '<span class="diff_add">Disallow: /&lt;changed&gt;</span>' in diff_html
+    assert "Disallow: /500" not in diff_html
+
+    # A summary is reported if the diff exceeds the limits
+    diff_html = diffs.html_diff(old, ["Disallow: /"] * 3000, context=1)
+    assert "More than" in diff_html
+    assert "Lines removed: 1001. Lines added: 3000." in diff_html
@@ -0,0 +1,41 @@
+def test_dns_cache(monkeypatch):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    from app.fetching import DNSCache
+
+    lookups = []
+
+    def mock_resolver(host, port, family=0, type=0, proto=0, flags=0):
+        lookups.append(host)
+        return [(2, 1, 6, '', ('127.0.0.1', port))]
+
+    cache = DNSCache(ttl=60)
+    cache.resolver = mock_resolver
+
+    assert cache.getaddrinfo("www.example.com", 443) == cache.getaddrinfo("www.example.com", 443)
+    cache.getaddrinfo("example.org", 443)
+    assert lookups == ["www.example.com", "example.org"]
+
+    # Expired results are looked up again
+    cache.ttl = 0
+    cache.getaddrinfo("example.net", 443)
+    cache.getaddrinfo("example.net", 443)
+    assert lookups.count("example.net") == 2
+
+
+def test_session_pool_size(monkeypatch):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.fetching as fetching
+
+    monkeypatch.setattr(fetching.config, "MAX_WORKERS", 32)
+    monkeypatch.setattr(fetching.config, "MAX_WORKERS_PER_HOST", 2)
+    monkeypatch.setattr(fetching, "session", None)
+
+    session = fetching.get_session()
+    adapter = session.get_adapter("https://www.example.com/robots.txt")
+
+    assert fetching.get_session() is session
+    assert session.headers['User-Agent'] == fetching.config.USER_AGENT
+    assert adapter._pool_connections == 32
+    assert adapter._pool_maxsize == 2
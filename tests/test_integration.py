@@ -5,10 +5,16 @@ import shutil
 
 def get_main_log_summary(main_log_path):
     """Return the latest main log summary line (if no fatal error)."""
-    with open(main_log_path, 'r') as f:
-        main_log_summary = f.readlines()[3]
+    from app.logs import get_latest_lines
 
-    return main_log_summary
+    return get_latest_lines(main_log_path, 4)[3]
+
+
+def get_site_log_summary(site_log_path):
+    """Return the latest site log line."""
+    from app.logs import get_latest_lines
+
+    return get_latest_lines(site_log_path, 1)[0]
 
 
 def get_previous_minute_timestamp():
@@ -60,10 +66,10 @@ def test_first_run(monkeypatch):
 
     # Check a single site
     site_dir = PATH + "data/www.bbc.co.uk"
-    def mock_sites_from_file(file):
+    def mock_iter_sites(file, shard=None):
         return [['https://www.bbc.co.uk/', 'The BBC', ''],]
 
-    monkeypatch.setattr("app.main.sites_from_file", mock_sites_from_file)
+    monkeypatch.setattr("app.main.iter_sites", mock_iter_sites)
 
     # Delete the existing site directory to simulate a new site
     if os.path.isdir(site_dir):
@@ -76,8 +82,7 @@ def test_first_run(monkeypatch):
     timestamp_prev_minute = get_previous_minute_timestamp()
 
     # Retrieve log summary lines
-    with open(site_dir + "/log.txt", 'r') as f:
-        site_log_summary = f.readlines()[0]
+    site_log_summary = get_site_log_summary(site_dir + "/log.txt")
 
     main_log_summary = get_main_log_summary(MAIN_LOG)
 
@@ -115,10 +120,10 @@ def test_no_change(monkeypatch):
     from app.logs import get_timestamp
 
     # Check a single site
-    def mock_sites_from_file(file):
+    def mock_iter_sites(file, shard=None):
         return [['https://github.com/', 'GitHub', ''],]
 
-    monkeypatch.setattr("app.main.sites_from_file", mock_sites_from_file)
+    monkeypatch.setattr("app.main.iter_sites", mock_iter_sites)
 
     # Run check once as a baseline and again to test no change is reported
     # Extremely unlikely that the file would change between the two runs
@@ -130,8 +135,7 @@ def test_no_change(monkeypatch):
     timestamp_prev_minute = get_previous_minute_timestamp()
 
     # Retrieve log summary lines
-    with open(PATH + "data/github.com/log.txt", 'r') as f:
-        site_log_summary = f.readlines()[0]
+    site_log_summary = get_site_log_summary(PATH + "data/github.com/log.txt")
 
     main_log_summary = get_main_log_summary(MAIN_LOG)
 
@@ -160,10 +164,10 @@ def test_change(monkeypatch):
 
     # Check a single site
     site_dir = PATH + "data/www.gov.uk"
-    def mock_sites_from_file(file):
+    def mock_iter_sites(file, shard=None):
         return [['https://www.gov.uk/', 'Gov UK', ''],]
 
-    monkeypatch.setattr("app.main.sites_from_file", mock_sites_from_file)
+    monkeypatch.setattr("app.main.iter_sites", mock_iter_sites)
 
     # Delete the existing site directory to simulate a new site
     if os.path.isdir(site_dir):
@@ -192,8 +196,7 @@ def test_change(monkeypatch):
     timestamp_prev_minute = get_previous_minute_timestamp()
 
     # Retrieve log summary lines
-    with open(site_dir + "/log.txt", 'r') as f:
-        site_log_summary = f.readlines()[0]
+    site_log_summary = get_site_log_summary(site_dir + "/log.txt")
 
     main_log_summary = get_main_log_summary(MAIN_LOG)
 
@@ -237,10 +240,10 @@ def test_check_error(monkeypatch):
     from app.logs import get_timestamp
 
     # Check a single site
-    def mock_sites_from_file(file):
+    def mock_iter_sites(file, shard=None):
         return [['http://www.goodreads.com/', 'Goodreads HTTP', ''],]
 
-    monkeypatch.setattr("app.main.sites_from_file", mock_sites_from_file)
+    monkeypatch.setattr("app.main.iter_sites", mock_iter_sites)
 
     # Run check against HTTP URL, which should return a non-200 status code
     # and cause the check to fail (report an error)
@@ -251,8 +254,7 @@ def test_check_error(monkeypatch):
     timestamp_prev_minute = get_previous_minute_timestamp()
 
     # Retrieve log summary lines
-    with open(PATH + "data/www.goodreads.com/log.txt", 'r') as f:
-        site_log_summary = f.readlines()[0]
+    site_log_summary = get_site_log_summary(PATH + "data/www.goodreads.com/log.txt")
 
     main_log_summary = get_main_log_summary(MAIN_LOG)
 
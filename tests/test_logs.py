@@ -0,0 +1,55 @@
+def write_prepended_log(file_path, entries):
+    """Write entries (oldest first) to a log file in the previous (newest first) format."""
+    content = ""
+    for entry in entries:
+        content = entry + "\n" + content
+
+    with open(file_path, 'w') as f:
+        f.write(content)
+
+    return content
+
+
+def test_migrate_and_read_log(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.logs as logs
+
+    log_file = str(tmp_path / "main_log.txt")
+    entries = [
+        "2024-01-01 10:00: Starting checks on 2 sites.",
+        "2024-01-01 10:00: Error: https://www.example.com/. Error details.\nTYPE: "
+        "<class 'Exception'>\nDETAILS: Example\nTRACEBACK:\n\nFile \"main.py\"\n",
+        "2024-01-01 10:01: Checks and reports complete.\n",
+        "\n{}\n".format(logs.END_OF_RUN),
+        "2024-01-02 10:00: Starting checks on 2 sites.",
+    ]
+    old_content = write_prepended_log(log_file, entries)
+
+    # The first update migrates the log before appending the new entry
+    logs.append_to_log(log_file, "2024-01-02 10:01: Checks and reports complete.\n")
+    entries.append("2024-01-02 10:01: Checks and reports complete.\n")
+
+    with open(log_file, 'r') as f:
+        assert f.read() == logs.LOG_HEADER + "\n" + "".join(e + "\n" for e in entries)
+
+    assert list(logs.read_log_entries(log_file)) == list(reversed(entries))
+
+    # The newest first view matches the previous format
+    expected_lines = ("2024-01-02 10:01: Checks and reports complete.\n\n" + old_content)
+    expected_lines = expected_lines.split("\n")[:-1]
+    assert logs.get_latest_lines(log_file, 100) == expected_lines
+
+    logs.append_to_log(log_file, "\n{}\n".format(logs.END_OF_RUN))
+    assert logs.get_latest_lines(log_file, 4)[3] == entries[-1].strip()
+
+
+def test_read_lines_reversed(tmp_path):
+    from app.logs import read_lines_reversed
+
+    file_path = str(tmp_path / "log.txt")
+    lines = ["line {}".format(i) * (i % 7) for i in range(200)]
+    with open(file_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+    assert list(read_lines_reversed(file_path, block_size=16)) == list(reversed(lines))
@@ -14,3 +14,210 @@ def test_sites_from_file(monkeypatch):
     ]
     
     assert sites_data == expected_sites_data
+
+
+def test_iter_sites_shards(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import argparse
+
+    import pytest
+
+    import app.main as main_module
+
+    sites_file = tmp_path / "monitored_sites.csv"
+    rows = ["https://www.example{}.com/,Example {},".format(i, i) for i in range(100)]
+    sites_file.write_text("URL,Name,Email\n" + "\n".join(rows) + "\n")
+    all_sites = main_module.sites_from_file(str(sites_file))
+    assert len(all_sites) == 100
+
+    # Each site is in exactly one shard, and shards are stable across reads
+    shards = [main_module.sites_from_file(str(sites_file), (i, 3)) for i in range(1, 4)]
+    assert sorted(site for shard in shards for site in shard) == sorted(all_sites)
+    assert all(shard for shard in shards)
+    assert main_module.sites_from_file(str(sites_file), (2, 3)) == shards[1]
+
+    assert main_module.parse_shard("2/3") == (2, 3)
+    for value in ["0/3", "4/3", "1", "a/b"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            main_module.parse_shard(value)
+
+
+def test_run_checks_order_and_host_limit(monkeypatch):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import threading
+    import time
+
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module.config, "MAX_WORKERS", 4)
+    monkeypatch.setattr(main_module.config, "MAX_WORKERS_PER_HOST", 1)
+
+    lock = threading.Lock()
+    running = {}
+    max_running = {}
+
+    class MockRobotsCheck:
+        def __init__(self, url):
+            self.url = url
+            self.retry_time = None
+
+        def run_check(self, defer_retries=False):
+            host = main_module.get_host(self.url)
+            with lock:
+                running[host] = running.get(host, 0) + 1
+                max_running[host] = max(max_running.get(host, 0), running[host])
+
+            # Finish earlier sites last to check that results are re-ordered
+            time.sleep(0.01 * (10 - int(self.url.split("/")[-2])))
+            with lock:
+                running[host] -= 1
+
+            return self
+
+    monkeypatch.setattr(main_module, "RobotsCheck", MockRobotsCheck)
+
+    sites = [["https://{}.example.com/{}/".format(i % 3, i), str(i), ""] for i in range(10)]
+    results = list(main_module.RunChecks(iter(sites)).run_checks())
+
+    assert [site for site, check in results] == sites
+    assert [check.url for site, check in results] == [site[0] for site in sites]
+    assert max(max_running.values()) == 1
+
+
+def test_run_checks_deferred_retry(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import time
+
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module.config, "PATH", str(tmp_path) + "/")
+    (tmp_path / "data").mkdir()
+
+    class MockSession:
+        def get(self, *args, **kwargs):
+            raise main_module.requests.exceptions.ConnectionError("Connection refused")
+
+    monkeypatch.setattr(main_module.fetching, "get_session", MockSession)
+
+    # A failed connection attempt defers the check instead of sleeping
+    check = main_module.RobotsCheck("https://www.example.com/").run_check(defer_retries=True)
+    assert check.err_message is None
+    assert check.attempts == 1
+    assert check.retry_time > time.monotonic() + 100
+
+    monkeypatch.setattr(main_module.config, "MAX_WORKERS", 1)
+    checked = []
+
+    class MockRobotsCheck:
+        def __init__(self, url):
+            self.url = url
+            self.retry_time = None
+
+        def run_check(self, defer_retries=False):
+            checked.append(self.url)
+            if self.url == "https://a.example.com/" and checked.count(self.url) == 1:
+                self.retry_time = time.monotonic() + 0.1
+            else:
+                self.retry_time = None
+
+            return self
+
+    monkeypatch.setattr(main_module, "RobotsCheck", MockRobotsCheck)
+
+    sites = [["https://a.example.com/", "A", ""], ["https://b.example.com/", "B", ""]]
+    results = list(main_module.RunChecks(sites).run_checks())
+
+    # Other sites are checked while the failed site waits, but results stay in order
+    assert checked == ["https://a.example.com/", "https://b.example.com/",
+                       "https://a.example.com/"]
+    assert [site for site, check in results] == sites
+
+
+def test_conditional_request(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module.config, "PATH", str(tmp_path) + "/")
+    (tmp_path / "data").mkdir()
+
+    sent_headers = []
+
+    class MockResponse:
+        def __init__(self, status_code, text="", headers=None):
+            self.status_code = status_code
+            self.text = text
+            self.headers = headers or {}
+
+    class MockSession:
+        def get(self, url, headers=None, **kwargs):
+            sent_headers.append(headers)
+            if headers.get("If-None-Match") == '"v1"':
+                return MockResponse(304)
+            return MockResponse(200, "User-agent: *\nDisallow:\n", {"ETag": '"v1"'})
+
+    monkeypatch.setattr(main_module.fetching, "get_session", MockSession)
+
+    first = main_module.RobotsCheck("https://www.example.com/").run_check()
+    assert first.first_run
+    assert "If-None-Match" not in sent_headers[-1]
+
+    # The validator is sent and a 304 response is treated as no change
+    second = main_module.RobotsCheck("https://www.example.com/").run_check()
+    assert sent_headers[-1]["If-None-Match"] == '"v1"'
+    assert second.not_modified
+    assert not (second.err_message or second.first_run or second.file_change)
+    with open(second.new_file, 'r') as f:
+        assert f.read() == "User-agent: *\nDisallow:\n"
+
+    # Validators are ignored if the recorded content has been modified
+    with open(second.new_file, 'a') as f:
+        f.write("Disallow: /extra\n")
+
+    third = main_module.RobotsCheck("https://www.example.com/").run_check()
+    assert "If-None-Match" not in sent_headers[-1]
+    assert third.file_change
+
+
+def test_unchanged_fingerprint_skips_records(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module.config, "PATH", str(tmp_path) + "/")
+    (tmp_path / "data").mkdir()
+
+    content = {"text": "User-agent: *\r\nDisallow: /a\r\n"}
+
+    class MockResponse:
+        status_code = 200
+        headers = {}
+
+        def __init__(self):
+            self.text = content["text"]
+
+    class MockSession:
+        def get(self, *args, **kwargs):
+            return MockResponse()
+
+    monkeypatch.setattr(main_module.fetching, "get_session", MockSession)
+
+    def run_check():
+        return main_module.RobotsCheck("https://www.example.com/").run_check()
+
+    assert run_check().first_run
+    content["text"] = "User-agent: *\nDisallow: /b\n"
+    assert run_check().file_change
+
+    # An unchanged fetch doesn't rotate or rewrite the content files
+    new_file = tmp_path / "data/www.example.com/program_files/new_file.txt"
+    new_file_mtime = new_file.stat().st_mtime_ns
+    check = run_check()
+    assert not check.file_change
+    assert check.new_content == "User-agent: *\nDisallow: /b\n"
+    with open(check.old_file, 'r') as f:
+        assert f.read() == "User-agent: *\nDisallow: /a\n"
+    assert new_file.stat().st_mtime_ns == new_file_mtime
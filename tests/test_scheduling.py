@@ -0,0 +1,69 @@
+def test_scheduler(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.main as main_module
+    from app.scheduling import Scheduler
+    from app.storage import FileStorage
+
+    config = main_module.config
+    monkeypatch.setattr(config, "PATH", str(tmp_path) + "/")
+    monkeypatch.setattr(config, "ADAPTIVE_SCHEDULE", True)
+    monkeypatch.setattr(config, "SCHEDULE_MIN_INTERVAL", 100)
+    monkeypatch.setattr(config, "SCHEDULE_MAX_INTERVAL", 1000)
+    monkeypatch.setattr(config, "SCHEDULE_BACKOFF", 2)
+
+    scheduler = Scheduler(FileStorage(), now=0)
+    stable, volatile = "https://stable.example.com/", "https://volatile.example.com/"
+    assert scheduler.is_due(stable) and scheduler.is_due(volatile)
+
+    # Stable sites back off (up to the maximum interval); changed sites are checked often
+    for now in [0, 200, 600, 1400, 2400]:
+        assert scheduler.is_due(stable, now)
+        scheduler.record(stable, "no_change", now)
+    assert scheduler.sites[stable]['interval'] == 1000
+    assert not scheduler.is_due(stable, 3000)
+    assert scheduler.is_due(stable, 3400)
+
+    scheduler.record(volatile, "first_run", 0)
+    scheduler.record(volatile, "change", 100)
+    assert scheduler.sites[volatile]['next_due'] == 200
+    assert scheduler.sites[volatile]['changes'] == 1
+
+    # Consecutive errors are retried with a growing interval
+    scheduler.record(volatile, "error", 200)
+    scheduler.record(volatile, "error", 300)
+    assert scheduler.sites[volatile]['next_due'] == 500
+    assert scheduler.get_next_due() == 500
+
+    # The history is saved, excluding sites which are no longer monitored
+    scheduler.sites["https://removed.example.com/"] = {'next_due': 0}
+    scheduler.save()
+    assert Scheduler(FileStorage()).sites == {stable: scheduler.sites[stable],
+                                              volatile: scheduler.sites[volatile]}
+
+
+def test_run_checks_skips_sites_not_due(monkeypatch):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module.config, "ADAPTIVE_SCHEDULE", True)
+
+    class MockStorage:
+        def load_state(self, name):
+            return {"https://b.example.com/": {'next_due': float('inf')}}
+
+    class MockRobotsCheck:
+        def __init__(self, url):
+            self.url = url
+            self.retry_time = None
+
+        def run_check(self, defer_retries=False):
+            return self
+
+    monkeypatch.setattr(main_module, "RobotsCheck", MockRobotsCheck)
+
+    sites = [["https://a.example.com/", "A", ""], ["https://b.example.com/", "B", ""]]
+    run_checks = main_module.RunChecks(sites, main_module.scheduling.Scheduler(MockStorage()))
+    assert [site for site, check in run_checks.run_checks()] == sites[:1]
+    assert run_checks.not_due == 1
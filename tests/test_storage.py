@@ -0,0 +1,67 @@
+import os
+
+
+def test_sqlite_storage(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROBOTS_MONITOR_ENV", "test")
+
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module.config, "PATH", str(tmp_path) + "/")
+    monkeypatch.setattr(main_module.config, "MAIN_LOG", str(tmp_path / "data/main_log.txt"))
+    monkeypatch.setattr(main_module.config, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(main_module.storage, "storage", None)
+    monkeypatch.setattr(main_module.storage.blobs, "store", None)
+    (tmp_path / "data").mkdir()
+
+    content = {"text": "User-agent: *\nDisallow: /a\n"}
+
+    class MockResponse:
+        status_code = 200
+        headers = {"ETag": '"v1"'}
+
+        def __init__(self):
+            self.text = content["text"]
+
+    class MockSession:
+        def get(self, *args, **kwargs):
+            return MockResponse()
+
+    monkeypatch.setattr(main_module.fetching, "get_session", MockSession)
+    monkeypatch.setattr(main_module.emails, "site_emails", [])
+
+    # Use a different timestamp for each run to avoid snapshot name clashes
+    timestamp = {"now": "2024-01-01 10:00"}
+    monkeypatch.setattr(main_module.logs, "get_timestamp", lambda **kwargs: timestamp["now"])
+
+    sites = [["https://www.example.com/", "Example", "test@example.com"]]
+    run_checks = main_module.RunChecks(sites)
+    run_checks.check_all()
+    content["text"] = "User-agent: *\nDisallow: /b\n"
+    timestamp["now"] = "2024-01-02 10:00"
+    run_checks.check_all()
+
+    assert run_checks.change == 1
+    # No site directories are created
+    assert not os.path.isdir(tmp_path / "data/www.example.com")
+    assert os.path.isfile(tmp_path / "data/robots_monitor.sqlite3")
+
+    backend = main_module.storage.get_storage()
+    log_entries = backend.get_site_log("www.example.com")
+    assert "Change: https://www.example.com/." in log_entries[0]
+    assert "First run: https://www.example.com/." in log_entries[1]
+    assert [row[0] for row in backend.get_snapshots("www.example.com")] == ["2024-01-01 1000",
+                                                                            "2024-01-02 1000"]
+    assert len(backend.get_snapshots("www.example.com", kind="diff")) == 1
+
+    # Email attachments are created from the records
+    address, subject, body, old_file, new_file, diff_file = main_module.emails.site_emails[-1]
+    with open(old_file, 'r') as f:
+        assert f.read() == "User-agent: *\nDisallow: /a\n"
+    with open(new_file, 'r') as f:
+        assert f.read() == "User-agent: *\nDisallow: /b\n"
+    assert os.path.isfile(diff_file)
+
+    # Records are committed and persist across connections
+    reopened = main_module.storage.SQLiteStorage(backend.db_file)
+    check = main_module.RobotsCheck("https://www.example.com/")
+    assert reopened.load_meta(check)["etag"] == '"v1"'